@@ -1,10 +1,22 @@
 import pygame
+import atexit
+import contextlib
 import math
+import os
+import sys
+import queue
+import tempfile
 import random
 import time
 import socket
 import threading
 import pickle
+import struct
+import re
+import selectors
+import signal
+from collections import OrderedDict
+from types import MappingProxyType
 from pypresence import Presence
 import numpy as np
 from typing import Dict, List, Tuple, Any, Optional, Union
@@ -17,6 +29,35 @@ logger = logging.getLogger("bulletverse")
 
 WIDTH, HEIGHT = 0, 0
 FPS = 60
+BACKGROUND_FPS = 20
+MAX_FRAME_STEPS = 4
+BLOCKED_EVENTS = [
+    pygame.MOUSEMOTION,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEWHEEL,
+    pygame.KEYUP,
+    pygame.TEXTINPUT,
+    pygame.TEXTEDITING,
+    pygame.FINGERMOTION,
+    pygame.FINGERDOWN,
+    pygame.FINGERUP,
+    pygame.JOYAXISMOTION,
+    pygame.JOYBALLMOTION,
+    pygame.JOYHATMOTION,
+]
+TWO_PI = 2 * math.pi
+ANGLE_BITS = 12
+ANGLE_STEPS = 1 << ANGLE_BITS
+ANGLE_SCALE = ANGLE_STEPS / TWO_PI
+UNIT_VECTORS = np.stack(
+    [
+        np.cos(np.linspace(0, TWO_PI, ANGLE_STEPS, endpoint=False)),
+        np.sin(np.linspace(0, TWO_PI, ANGLE_STEPS, endpoint=False)),
+    ],
+    1,
+).astype(np.float32)
+UNIT_VECTOR_TABLE = [tuple(vector) for vector in UNIT_VECTORS.tolist()]
+RNG = np.random.default_rng()
 COLORS = {
     "WHITE": (255, 255, 255),
     "BLUE": (50, 100, 255),
@@ -37,6 +78,28 @@ ENEMY_BULLET_SPEED = 5
 ENEMY_FIRE_RATE = 80
 NUM_ENEMIES = 6
 MAX_STAT_LEVEL = 8
+PARTICLE_BUDGET = 500
+PARTICLE_CAPACITY = 4096
+LOADING_PARTICLE_CAPACITY = 30
+SPAWN_DT = 1 / 30
+PARTICLE_ALPHA_BINS = 16
+PARTICLE_PALETTE_SIZE = 1 << 16
+POWERUP_POOL_SIZE = 32
+POWERUP_TYPES = ("health", "shield", "speed", "damage", "xp")
+POWERUP_CUM_WEIGHTS = (0.25, 0.45, 0.65, 0.85, 1.0)
+RESPAWN_TRIES = 10
+ICON_SIZE = 32
+TEXT_CACHE_SIZE = 128
+TEXT_PIECES = re.compile(r"\d|\D+")
+DISCORD_RPC_INTERVAL = 15
+SHUTDOWN_TIMEOUT = 0.5
+DEATH_DIM_COLOR = (75, 75, 75)
+EFFECT_LABELS = {
+    "shield": "Shield",
+    "speed_boost": "Speed Boost",
+    "damage_boost": "Damage Boost",
+}
+MENU_BUBBLE_INDEX = np.arange(20)
 PLAYER_COLORS = [
     COLORS["BLUE"],
     COLORS["GREEN"],
@@ -49,7 +112,68 @@ PLAYER_COLORS = [
 
 SERVER_HOST = "localhost"
 SERVER_PORT = 5555
-BUFFER_SIZE = 8192
+BUFFER_SIZE = 65536
+HEADER_SIZE = 4
+SOCKET_BUFFER_SIZE = 131072
+SERVER_TICK_RATE = 100
+CLIENT_BACKLOG_LIMIT = 4 * SOCKET_BUFFER_SIZE
+KEYFRAME_INTERVAL = 60
+NEW_BULLET_RECORD = struct.Struct("<5f")
+ENEMY_TYPES = ("normal", "fast", "tank")
+ENEMY_DTYPE = np.dtype(
+    [
+        ("x", "<f4"),
+        ("y", "<f4"),
+        ("angle", "<f4"),
+        ("health", "<f4"),
+        ("max_health", "<f4"),
+        ("size", "<f4"),
+        ("type", "u1"),
+    ]
+)
+
+BULLET_DTYPE = np.dtype(
+    [
+        ("x", "<f4"),
+        ("y", "<f4"),
+        ("angle", "<f4"),
+        ("penetration", "<f4"),
+        ("damage", "<f4"),
+        ("owner", "<i4"),
+    ]
+)
+SERVER_BULLET_CAPACITY = 256
+DIRTY_CELL_SIZE = 32
+NO_INDICES = np.empty(0, np.intp)
+GRID_STRIDE = 1 << 16
+GRID_NEIGHBORS = np.array(
+    [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)], np.int64
+)
+CACHE_LINE = 64
+
+UPGRADE_STATS = (
+    ("Health Max", "max_health", 10),
+    ("Health Regen", "regen", 0.5),
+    ("Bullet Damage", "bullet_damage", 2),
+    ("Bullet Speed", "bullet_speed", 0.5),
+    ("Bullet Penetration", "bullet_penetration", 1),
+    ("Reload Speed", "bullet_reload", -1),
+    ("Movement Speed", "movement_speed", 0.2),
+)
+STAT_BASE = MappingProxyType(
+    {
+        "max_health": 100,
+        "regen": 0,
+        "bullet_damage": 10,
+        "bullet_speed": BULLET_SPEED,
+        "bullet_penetration": 1,
+        "bullet_reload": 10,
+        "movement_speed": 4,
+    }
+)
+STAT_INCREMENT = MappingProxyType(
+    {stat_key: increment for _, stat_key, increment in UPGRADE_STATS}
+)
 
 DIFFICULTY_SETTINGS = {
     "easy": {
@@ -72,6 +196,110 @@ DIFFICULTY_SETTINGS = {
     },
 }
 
+FONT_CACHE: Dict[int, pygame.font.Font] = {}
+
+
+def get_font(size: int) -> pygame.font.Font:
+    font = FONT_CACHE.get(size)
+    if font is None:
+        font = FONT_CACHE[size] = pygame.font.Font(None, size)
+    return font
+
+
+def display_format(surface: pygame.Surface) -> pygame.Surface:
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+BULLET_SPRITE_CACHE: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
+
+def get_bullet_sprite(color) -> pygame.Surface:
+    sprite = BULLET_SPRITE_CACHE.get(color)
+    if sprite is None:
+        sprite = pygame.Surface((10, 10), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (5, 5), 5)
+        sprite = display_format(sprite)
+        sprite.set_alpha(255, pygame.RLEACCEL)
+        BULLET_SPRITE_CACHE[color] = sprite
+    return sprite
+
+
+TANK_BODY_CACHE: Dict[Tuple, pygame.Surface] = {}
+
+
+def get_tank_body(color, radius: int) -> pygame.Surface:
+    key = (color, radius)
+    body = TANK_BODY_CACHE.get(key)
+    if body is None:
+        center = radius + 3
+        body = pygame.Surface((2 * center, 2 * center), pygame.SRCALPHA)
+        pygame.draw.circle(body, COLORS["BLACK"], (center, center), radius + 2)
+        pygame.draw.circle(body, color, (center, center), radius)
+        body = display_format(body)
+        TANK_BODY_CACHE[key] = body
+    return body
+
+
+HEALTH_BAR_CACHE: Dict[Tuple, pygame.Surface] = {}
+
+
+def get_health_bar(color, width: int) -> pygame.Surface:
+    key = (color, width)
+    bar = HEALTH_BAR_CACHE.get(key)
+    if bar is None:
+        bar = pygame.Surface((width, 5))
+        bar.fill(color)
+        bar = display_format(bar)
+        HEALTH_BAR_CACHE[key] = bar
+    return bar
+
+
+BUBBLE_SPRITE_CACHE: Dict[Tuple, pygame.Surface] = {}
+
+
+def get_bubble_sprite(color, radius: int) -> pygame.Surface:
+    key = (color, radius)
+    sprite = BUBBLE_SPRITE_CACHE.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((2 * radius, 2 * radius))
+        sprite.fill(COLORS["BLACK"])
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite = display_format(sprite)
+        sprite.set_colorkey(COLORS["BLACK"])
+        BUBBLE_SPRITE_CACHE[key] = sprite
+    return sprite
+
+
+def cell_rects(
+    offsets: np.ndarray, extent: int, cell_size: int = DIRTY_CELL_SIZE
+) -> List[pygame.Rect]:
+    cells = offsets // cell_size
+    codes = np.unique(cells[:, 0] * GRID_STRIDE + cells[:, 1])
+    xs, ys = np.divmod(codes + GRID_STRIDE // 2, GRID_STRIDE)
+    ys -= GRID_STRIDE // 2
+    size = cell_size + extent
+    return [
+        pygame.Rect(x * cell_size, y * cell_size, size, size)
+        for x, y in zip(xs.tolist(), ys.tolist())
+    ]
+
+
+def blit_batch(
+    screen: pygame.Surface, blits: List, dirty: Optional[List] = None
+):
+    if dirty is not None:
+        dirty += screen.blits(blits)
+        return
+    fblits = getattr(screen, "fblits", None)
+    if fblits is not None:
+        fblits(blits)
+    else:
+        screen.blits(blits, doreturn=False)
+
 
 class LoadingScreen:
 
@@ -81,6 +309,7 @@ class LoadingScreen:
         self.height = screen_height
         self.font = font
         self.title_font = title_font
+        self.title_surface = None
         self.progress = 0
         self.max_progress = 100
         self.loading_tasks = []
@@ -98,11 +327,20 @@ class LoadingScreen:
             "GRAY": (200, 200, 200),
             "DARK_GRAY": (100, 100, 100),
         }
-        self.particles = []
+        self.particles = ParticleSystem(LOADING_PARTICLE_CAPACITY)
+        self.spawn_accum = 0.0
+        self.percentage_text = None
+        self.percentage_value = None
 
         self.tips = self.generate_tips()
-        self.current_tip = random.choice(self.tips)
+        random.shuffle(self.tips)
+        self.tip_index = 0
+        self.current_tip = self.tips[self.tip_index]
         self.tip_change_timer = 0
+        self.tip_surface = None
+        self.tip_text = None
+        self.loading_surface = None
+        self.loading_key = None
 
     def generate_tips(self):
         return [
@@ -142,19 +380,17 @@ class LoadingScreen:
 
         self.tip_change_timer += dt
         if self.tip_change_timer > 3.0:
-            self.current_tip = random.choice(self.tips)
+            self.tip_index = (self.tip_index + 1) % len(self.tips)
+            self.current_tip = self.tips[self.tip_index]
             self.tip_change_timer = 0
 
-        for particle in list(self.particles):
-            particle["pos"][0] += particle["velocity"][0] * dt
-            particle["pos"][1] += particle["velocity"][1] * dt
-            particle["life"] -= dt
+        self.particles.update(dt)
 
-            if particle["life"] <= 0:
-                self.particles.remove(particle)
-
-        if len(self.particles) < 30 and pygame.time.get_ticks() % 100 < 10:
-            self.add_particle()
+        self.spawn_accum += dt
+        while self.spawn_accum > SPAWN_DT:
+            self.spawn_accum -= SPAWN_DT
+            if len(self.particles) < LOADING_PARTICLE_CAPACITY:
+                self.add_particle()
 
         if (
             self.current_task_index < len(self.loading_tasks)
@@ -178,43 +414,30 @@ class LoadingScreen:
     def draw(self):
         self.screen.fill(self.colors["WHITE"])
 
-        for particle in self.particles:
-            alpha = int(255 * (particle["life"] / particle["max_life"]))
-            color = (*particle["color"], alpha)
-            pos = (int(particle["pos"][0]), int(particle["pos"][1]))
+        self.particles.draw(self.screen)
 
-            particle_surface = pygame.Surface(
-                (int(particle["size"]) * 2, int(particle["size"]) * 2),
-                pygame.SRCALPHA,
-            )
-            pygame.draw.circle(
-                particle_surface,
-                color,
-                (int(particle["size"]), int(particle["size"])),
-                int(particle["size"]),
-            )
-            self.screen.blit(
-                particle_surface,
-                (
-                    pos[0] - int(particle["size"]),
-                    pos[1] - int(particle["size"]),
-                ),
+        if self.title_surface is None:
+            self.title_surface = display_format(
+                self.title_font.render(
+                    "BULLETVERSE.IO", True, self.colors["BLUE"]
+                )
             )
-
-        title = self.title_font.render(
-            "BULLETVERSE.IO", True, self.colors["BLUE"]
+        title_rect = self.title_surface.get_rect(
+            center=(self.width // 2, self.height // 3)
         )
-        title_rect = title.get_rect(center=(self.width // 2, self.height // 3))
-        self.screen.blit(title, title_rect)
+        self.screen.blit(self.title_surface, title_rect)
 
-        dots = "." * self.animation_dots
-        loading_text = self.font.render(
-            f"{self.current_task_text}{dots}", True, self.colors["BLACK"]
-        )
-        text_rect = loading_text.get_rect(
+        loading_key = (self.current_task_text, self.animation_dots)
+        if loading_key != self.loading_key:
+            dots = "." * self.animation_dots
+            self.loading_surface = self.font.render(
+                f"{self.current_task_text}{dots}", True, self.colors["BLACK"]
+            )
+            self.loading_key = loading_key
+        text_rect = self.loading_surface.get_rect(
             center=(self.width // 2, self.height // 2 + 50)
         )
-        self.screen.blit(loading_text, text_rect)
+        self.screen.blit(self.loading_surface, text_rect)
 
         bar_width = self.width // 2
         bar_height = 20
@@ -241,50 +464,90 @@ class LoadingScreen:
             if self.max_progress > 0
             else 0
         )
-        percentage_text = self.font.render(
-            f"{percentage}%", True, self.colors["WHITE"]
-        )
-        percentage_rect = percentage_text.get_rect(
+        if percentage != self.percentage_value:
+            self.percentage_text = self.font.render(
+                f"{percentage}%", True, self.colors["WHITE"]
+            )
+            self.percentage_value = percentage
+        percentage_rect = self.percentage_text.get_rect(
             center=(bar_x + bar_width // 2, bar_y + bar_height // 2)
         )
-        self.screen.blit(percentage_text, percentage_rect)
+        self.screen.blit(self.percentage_text, percentage_rect)
 
-        tip = self.font.render(
-            f"Tip: {self.current_tip}", True, self.colors["DARK_GRAY"]
+        if self.current_tip != self.tip_text:
+            self.tip_surface = self.font.render(
+                f"Tip: {self.current_tip}", True, self.colors["DARK_GRAY"]
+            )
+            self.tip_text = self.current_tip
+        tip_rect = self.tip_surface.get_rect(
+            center=(self.width // 2, self.height - 50)
         )
-        tip_rect = tip.get_rect(center=(self.width // 2, self.height - 50))
-        self.screen.blit(tip, tip_rect)
+        self.screen.blit(self.tip_surface, tip_rect)
 
         pygame.display.flip()
 
     def add_particle(self):
         pos_x = random.randint(0, self.width)
         pos_y = random.randint(0, self.height)
-        angle = random.uniform(0, 2 * math.pi)
+        cos_a, sin_a = unit_vector()
         speed = random.uniform(5, 20)
-        velocity = [speed * math.cos(angle), speed * math.sin(angle)]
+        velocity = [speed * cos_a, speed * sin_a]
         size = random.uniform(2, 5)
         life = random.uniform(1, 3)
 
         blue_value = random.randint(180, 255)
         color = (50, 100, blue_value)
 
-        self.particles.append(
-            {
-                "pos": [pos_x, pos_y],
-                "velocity": velocity,
-                "color": color,
-                "life": life,
-                "max_life": life,
-                "size": size,
-            }
-        )
+        self.particles.emit((pos_x, pos_y), [velocity], color, life, [size])
 
 
 class ParticleSystem:
 
-    def __init__(self):
-        self.particles = []
+    sprite_cache: Dict[int, pygame.Surface] = {}
+    palette: List[Tuple[int, int, int]] = []
+    palette_ids: Dict[Tuple[int, int, int], int] = {}
+
+    def __init__(self, capacity: int = PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.frame_budget = PARTICLE_BUDGET
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint16)
+        self.scratch = np.empty_like(self.velocity)
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def color_id(cls, color) -> int:
+        color = tuple(int(channel) for channel in color)
+        color_id = cls.palette_ids.get(color)
+        if color_id is None:
+            color_id = cls.palette_ids[color] = len(cls.palette)
+            cls.palette.append(color)
+        return color_id
+
+    def emit(self, pos, velocity, color, life, size):
+        count = min(len(size), self.frame_budget, self.capacity - self.count)
+        if count <= 0:
+            return
+        self.frame_budget -= count
+
+        start, end = self.count, self.count + count
+        self.pos[start:end] = pos[:count] if np.ndim(pos) == 2 else pos
+        self.velocity[start:end] = velocity[:count]
+        if np.ndim(color) == 2:
+            self.color[start:end] = [self.color_id(c) for c in color[:count]]
+        else:
+            self.color[start:end] = self.color_id(color)
+        self.life[start:end] = life[:count] if np.ndim(life) else life
+        self.max_life[start:end] = self.life[start:end]
+        self.size[start:end] = size[:count]
+        self.count = end
 
     def add_particles(
         self,
@@ -294,74 +557,120 @@ class ParticleSystem:
         speed: float = 2.0,
         life: int = 30,
     ):
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            velocity = [speed * math.cos(angle), speed * math.sin(angle)]
-            size = random.uniform(1, 3)
-            self.particles.append(
-                {
-                    "pos": [pos[0], pos[1]],
-                    "velocity": velocity,
-                    "color": color,
-                    "life": life,
-                    "max_life": life,
-                    "size": size,
-                }
-            )
-            self.available_colors = {
-                "Blue": COLORS["BLUE"],
-                "Green": COLORS["GREEN"],
-                "Purple": COLORS["PURPLE"],
-                "Yellow": COLORS["YELLOW"],
-                "Orange": COLORS["ORANGE"],
-                "Cyan": COLORS["CYAN"],
-                "Magenta": COLORS["MAGENTA"],
-                "Red": COLORS["RED"],
-            }
-        self.player_color_name = "Blue"
-        self.player_color = self.available_colors[self.player_color_name]
-        self.show_cosmetics_menu = False
+        count = min(count, self.frame_budget, self.capacity - self.count)
+        if count <= 0:
+            return
 
-    def update(self):
-        for particle in list(self.particles):
-            particle["pos"][0] += particle["velocity"][0]
-            particle["pos"][1] += particle["velocity"][1]
-            particle["life"] -= 1
+        velocity = speed * UNIT_VECTORS[RNG.integers(0, ANGLE_STEPS, count)]
+        size = 1 + 2 * RNG.random(count, dtype=np.float32)
 
-            if particle["life"] <= 0:
-                self.particles.remove(particle)
+        self.emit(pos, velocity, color, life, size)
 
-    def draw(self, screen):
-        for particle in self.particles:
-            alpha = int(255 * (particle["life"] / particle["max_life"]))
-            color = (*particle["color"], alpha)
-            pos = (int(particle["pos"][0]), int(particle["pos"][1]))
+    def update(self, dt: float = 1.0):
+        self.frame_budget = PARTICLE_BUDGET
 
-            particle_surface = pygame.Surface(
-                (int(particle["size"]) * 2, int(particle["size"]) * 2),
-                pygame.SRCALPHA,
-            )
+        n = self.count
+        if n == 0:
+            return
+
+        dt = np.float32(dt)
+        scratch = self.scratch[:n]
+        np.multiply(self.velocity[:n], dt, out=scratch)
+        self.pos[:n] += scratch
+        self.life[:n] -= dt
+
+        self.count = compact(
+            (
+                self.pos,
+                self.velocity,
+                self.life,
+                self.max_life,
+                self.size,
+                self.color,
+            ),
+            self.life[:n] > 0,
+        )
+
+    @classmethod
+    def get_sprite(cls, key: int) -> pygame.Surface:
+        sprite = cls.sprite_cache.get(key)
+        if sprite is None:
+            rest, alpha_bin = divmod(key, PARTICLE_ALPHA_BINS)
+            size, color_id = divmod(rest, PARTICLE_PALETTE_SIZE)
+            sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
             pygame.draw.circle(
-                particle_surface,
-                color,
-                (int(particle["size"]), int(particle["size"])),
-                int(particle["size"]),
-            )
-            screen.blit(
-                particle_surface,
+                sprite,
                 (
-                    pos[0] - int(particle["size"]),
-                    pos[1] - int(particle["size"]),
+                    *cls.palette[color_id],
+                    alpha_bin * 255 // (PARTICLE_ALPHA_BINS - 1),
                 ),
+                (size, size),
+                size,
             )
+            sprite = display_format(sprite)
+            sprite.set_alpha(255, pygame.RLEACCEL)
+            cls.sprite_cache[key] = sprite
+        return sprite
+
+    def draw(self, screen, dirty: Optional[List] = None):
+        n = self.count
+        if n == 0:
+            return
+
+        size = self.size[:n].astype(np.int32)
+        alpha_bins = (
+            (PARTICLE_ALPHA_BINS - 1) * self.life[:n] / self.max_life[:n]
+        ).astype(np.int32)
+        keys = (
+            size * PARTICLE_PALETTE_SIZE + self.color[:n]
+        ) * PARTICLE_ALPHA_BINS + alpha_bins
+        offsets = self.pos[:n].astype(np.int32) - size[:, None]
+
+        width, height = screen.get_size()
+        visible = (
+            (offsets[:, 0] > -2 * size)
+            & (offsets[:, 1] > -2 * size)
+            & (offsets[:, 0] < width)
+            & (offsets[:, 1] < height)
+        )
+        if not visible.all():
+            keys = keys[visible]
+            offsets = offsets[visible]
+
+        sprites = self.sprite_cache
+        get_sprite = self.get_sprite
+        blits = [
+            (sprites.get(key) or get_sprite(key), offset)
+            for key, offset in zip(keys.tolist(), offsets.tolist())
+        ]
+        blit_batch(screen, blits)
+
+        if dirty is not None and len(offsets):
+            dirty += cell_rects(offsets, 2 * int(size.max()))
 
 
 class PowerUp:
+    __slots__ = (
+        "radius",
+        "pos",
+        "type",
+        "active",
+        "creation_time",
+        "pulse_size",
+        "pulse_growing",
+        "color",
+        "effect",
+    )
+    icon_cache: Dict[str, pygame.Surface] = {}
+    ring_cache: Dict[Tuple, pygame.Surface] = {}
 
     def __init__(self, pos: Tuple[float, float], type_name: str):
+        self.radius = 15
+        self.reset(pos, type_name)
+
+    def reset(self, pos: Tuple[float, float], type_name: str):
         self.pos = pos
         self.type = type_name
-        self.radius = 15
         self.active = True
         self.creation_time = time.time()
         self.pulse_size = 0
@@ -394,96 +703,131 @@ class PowerUp:
             if self.pulse_size <= 0:
                 self.pulse_growing = True
 
-    def draw(self, screen):
-        pygame.draw.circle(
-            screen,
-            self.color,
-            (int(self.pos[0]), int(self.pos[1])),
-            int(self.radius + self.pulse_size),
-            2,
-        )
-
-        pygame.draw.circle(
-            screen,
-            self.color,
-            (int(self.pos[0]), int(self.pos[1])),
-            self.radius,
-        )
-
-        if self.type == "health":
-            pygame.draw.line(
-                screen,
-                COLORS["WHITE"],
-                (self.pos[0] - 8, self.pos[1]),
-                (self.pos[0] + 8, self.pos[1]),
-                3,
-            )
-            pygame.draw.line(
-                screen,
-                COLORS["WHITE"],
-                (self.pos[0], self.pos[1] - 8),
-                (self.pos[0], self.pos[1] + 8),
-                3,
-            )
-        elif self.type == "shield":
+    @classmethod
+    def get_icon(cls, type_name: str, color) -> pygame.Surface:
+        icon = cls.icon_cache.get(type_name)
+        if icon is not None:
+            return icon
+
+        size = ICON_SIZE
+        c = size // 2
+        icon = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(icon, color, (c, c), 15)
+
+        if type_name == "health":
+            pygame.draw.line(icon, COLORS["WHITE"], (c - 8, c), (c + 8, c), 3)
+            pygame.draw.line(icon, COLORS["WHITE"], (c, c - 8), (c, c + 8), 3)
+        elif type_name == "shield":
             pygame.draw.arc(
-                screen,
+                icon,
                 COLORS["WHITE"],
-                (self.pos[0] - 8, self.pos[1] - 8, 16, 16),
+                (c - 8, c - 8, 16, 16),
                 math.pi / 4,
                 math.pi * 7 / 4,
                 3,
             )
-        elif self.type == "speed":
+        elif type_name == "speed":
             points = [
-                (self.pos[0] - 5, self.pos[1] - 8),
-                (self.pos[0], self.pos[1]),
-                (self.pos[0] - 2, self.pos[1]),
-                (self.pos[0] + 5, self.pos[1] + 8),
-                (self.pos[0], self.pos[1]),
-                (self.pos[0] + 2, self.pos[1]),
+                (c - 5, c - 8),
+                (c, c),
+                (c - 2, c),
+                (c + 5, c + 8),
+                (c, c),
+                (c + 2, c),
             ]
-            pygame.draw.lines(screen, COLORS["WHITE"], False, points, 2)
-        elif self.type == "damage":
+            pygame.draw.lines(icon, COLORS["WHITE"], False, points, 2)
+        elif type_name == "damage":
             pygame.draw.polygon(
-                screen,
+                icon,
                 COLORS["WHITE"],
                 [
-                    (self.pos[0], self.pos[1] - 8),
-                    (self.pos[0] + 3, self.pos[1] - 3),
-                    (self.pos[0] + 8, self.pos[1] - 3),
-                    (self.pos[0] + 4, self.pos[1] + 2),
-                    (self.pos[0] + 6, self.pos[1] + 8),
-                    (self.pos[0], self.pos[1] + 5),
-                    (self.pos[0] - 6, self.pos[1] + 8),
-                    (self.pos[0] - 4, self.pos[1] + 2),
-                    (self.pos[0] - 8, self.pos[1] - 3),
-                    (self.pos[0] - 3, self.pos[1] - 3),
+                    (c, c - 8),
+                    (c + 3, c - 3),
+                    (c + 8, c - 3),
+                    (c + 4, c + 2),
+                    (c + 6, c + 8),
+                    (c, c + 5),
+                    (c - 6, c + 8),
+                    (c - 4, c + 2),
+                    (c - 8, c - 3),
+                    (c - 3, c - 3),
                 ],
             )
         else:
-            font = pygame.font.Font(None, 20)
-            text = font.render("XP", True, COLORS["WHITE"])
-            text_rect = text.get_rect(center=(self.pos[0], self.pos[1]))
-            screen.blit(text, text_rect)
+            text = get_font(20).render("XP", True, COLORS["WHITE"])
+            icon.blit(text, text.get_rect(center=(c, c)))
+
+        icon = cls.icon_cache[type_name] = display_format(icon)
+        return icon
+
+    @classmethod
+    def get_ring(cls, color, radius: int) -> pygame.Surface:
+        key = (color, radius)
+        ring = cls.ring_cache.get(key)
+        if ring is None:
+            c = radius + 1
+            ring = pygame.Surface((c * 2, c * 2), pygame.SRCALPHA)
+            pygame.draw.circle(ring, color, (c, c), radius, 2)
+            ring = cls.ring_cache[key] = display_format(ring)
+        return ring
+
+    def draw(self, screen) -> pygame.Rect:
+        x, y = int(self.pos[0]), int(self.pos[1])
+        radius = int(self.radius + self.pulse_size)
+        ring_rect = screen.blit(
+            self.get_ring(self.color, radius), (x - radius - 1, y - radius - 1)
+        )
+
+        half = ICON_SIZE // 2
+        return ring_rect.union(
+            screen.blit(
+                self.get_icon(self.type, self.color), (x - half, y - half)
+            )
+        )
 
 
-def spawn_enemy(difficulty: str = "normal") -> Dict:
+def unit_vector() -> Tuple[float, float]:
+    return UNIT_VECTOR_TABLE[random.getrandbits(ANGLE_BITS)]
+
+
+def skip_particles(*args):
+    pass
+
+
+def angle_vector(angle: float) -> Tuple[float, float]:
+    return UNIT_VECTOR_TABLE[round(angle * ANGLE_SCALE) & (ANGLE_STEPS - 1)]
+
+
+def spawn_enemies(count: int, difficulty: str = "normal") -> List[Dict]:
     settings = DIFFICULTY_SETTINGS[difficulty]
 
-    return {
-        "pos": [
-            random.randint(50, WIDTH - 50),
-            random.randint(50, HEIGHT - 50),
-        ],
-        "angle": random.uniform(0, 2 * math.pi),
-        "speed": settings["enemy_speed"] * random.uniform(0.8, 1.2),
-        "health": settings["enemy_health"],
-        "max_health": settings["enemy_health"],
-        "fire_timer": random.randint(0, ENEMY_FIRE_RATE),
-        "type": random.choice(["normal", "fast", "tank"]),
-        "size": random.uniform(0.8, 1.2) * 20,
-    }
+    xs = RNG.integers(50, WIDTH - 49, count).astype(float).tolist()
+    ys = RNG.integers(50, HEIGHT - 49, count).astype(float).tolist()
+    angles = RNG.uniform(0, TWO_PI, count).tolist()
+    speeds = (settings["enemy_speed"] * RNG.uniform(0.8, 1.2, count)).tolist()
+    fire_timers = RNG.integers(0, ENEMY_FIRE_RATE + 1, count).tolist()
+    types = RNG.integers(0, len(ENEMY_TYPES), count).tolist()
+    sizes = (RNG.uniform(0.8, 1.2, count) * 20).tolist()
+
+    return [
+        {
+            "pos": [x, y],
+            "angle": angle,
+            "speed": speed,
+            "health": settings["enemy_health"],
+            "max_health": settings["enemy_health"],
+            "fire_timer": fire_timer,
+            "type": ENEMY_TYPES[type_index],
+            "size": size,
+        }
+        for x, y, angle, speed, fire_timer, type_index, size in zip(
+            xs, ys, angles, speeds, fire_timers, types, sizes
+        )
+    ]
+
+
+def spawn_enemy(difficulty: str = "normal") -> Dict:
+    return spawn_enemies(1, difficulty)[0]
 
 
 class Button:
@@ -508,10 +852,12 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.hovered = False
-        self.font = pygame.font.Font(None, font_size)
+        self.font = get_font(font_size)
         self.border_radius = border_radius
         self.border_width = border_width
         self.clicked = False
+        self.text_surf = None
+        self.text_key = None
 
     def draw(self, screen):
         color = self.hover_color if self.hovered else self.color
@@ -533,9 +879,14 @@ class Button:
                 screen, COLORS["BLACK"], self.rect, self.border_width
             )
 
-        text_surf = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        text_key = (self.text, self.text_color)
+        if text_key != self.text_key:
+            self.text_surf = display_format(
+                self.font.render(self.text, True, self.text_color)
+            )
+            self.text_key = text_key
+        text_rect = self.text_surf.get_rect(center=self.rect.center)
+        screen.blit(self.text_surf, text_rect)
 
     def update(self, mouse_pos: Tuple[int, int]):
         self.hovered = self.rect.collidepoint(mouse_pos)
@@ -570,7 +921,9 @@ class Slider:
         self.color = color
         self.handle_radius = height * 1.5
         self.dragging = False
-        self.font = pygame.font.Font(None, 20)
+        self.font = get_font(20)
+        self.label_surface = None
+        self.label_value = None
 
         self.handle_pos = self.get_handle_pos()
 
@@ -603,13 +956,16 @@ class Slider:
             2,
         )
 
-        label_surface = self.font.render(
-            f"{self.label}: {self.value:.1f}", True, COLORS["BLACK"]
-        )
-        label_rect = label_surface.get_rect(
+        label_value = round(self.value, 1)
+        if label_value != self.label_value:
+            self.label_surface = self.font.render(
+                f"{self.label}: {self.value:.1f}", True, COLORS["BLACK"]
+            )
+            self.label_value = label_value
+        label_rect = self.label_surface.get_rect(
             midleft=(self.rect.x, self.rect.y - 10)
         )
-        screen.blit(label_surface, label_rect)
+        screen.blit(self.label_surface, label_rect)
 
     def update(
         self,
@@ -643,6 +999,565 @@ class Slider:
         return self.value
 
 
+def pack_bullets(bullets: np.ndarray) -> bytes:
+    return np.asarray(bullets, BULLET_DTYPE).tobytes()
+
+
+def unpack_bullets(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, BULLET_DTYPE)
+
+
+def pack_new_bullets(bullets: List[Tuple[float, ...]]) -> bytes:
+    return b"".join(
+        NEW_BULLET_RECORD.pack(*bullet[:5]) for bullet in list(bullets)
+    )
+
+
+def unpack_new_bullets(data: bytes) -> List[Tuple[float, ...]]:
+    return list(NEW_BULLET_RECORD.iter_unpack(data))
+
+
+def pack_enemies(enemies: np.ndarray) -> bytes:
+    return np.asarray(enemies, ENEMY_DTYPE).tobytes()
+
+
+def unpack_enemies(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, ENEMY_DTYPE)
+
+
+MESSAGE_CODECS = {
+    "bullets": (pack_bullets, unpack_bullets),
+    "new_bullets": (pack_new_bullets, unpack_new_bullets),
+    "enemies": (pack_enemies, unpack_enemies),
+}
+
+
+def pack_message(message: Dict) -> Dict:
+    packed = dict(message)
+    for key, (pack, _) in MESSAGE_CODECS.items():
+        if key in packed and not isinstance(packed[key], bytes):
+            packed[key] = pack(packed[key])
+    return packed
+
+
+def encode_message(message: Dict) -> bytes:
+    return pickle.dumps(
+        pack_message(message), protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+
+def decode_message(data) -> Dict:
+    message = pickle.loads(data)
+    for key, (_, unpack) in MESSAGE_CODECS.items():
+        if isinstance(message.get(key), bytes):
+            message[key] = unpack(message[key])
+    return message
+
+
+def configure_socket(sock: socket.socket):
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+
+
+def snapshot_state(state: Dict) -> Dict:
+    snapshot = dict(state)
+    snapshot["players"] = {
+        player_id: dict(player)
+        for player_id, player in list(state.get("players", {}).items())
+    }
+    snapshot["powerups"] = list(state.get("powerups", []))
+    return snapshot
+
+
+def diff_state(previous: Dict, state: Dict) -> Dict:
+    delta = {
+        key: value
+        for key, value in state.items()
+        if key != "players" and previous.get(key) != value
+    }
+    players = state["players"]
+    previous_players = previous["players"]
+    delta["players"] = {
+        player_id: player
+        for player_id, player in players.items()
+        if previous_players.get(player_id) != player
+    }
+    delta["removed_players"] = [
+        player_id for player_id in previous_players if player_id not in players
+    ]
+    return delta
+
+
+def apply_state_delta(state: Dict, delta: Dict) -> Dict:
+    if delta.pop("keyframe", False):
+        return delta
+
+    players = dict(state.get("players", {}))
+    players.update(delta.pop("players", {}))
+    for player_id in delta.pop("removed_players", []):
+        players.pop(player_id, None)
+
+    merged = dict(state)
+    merged.update(delta)
+    merged["players"] = players
+    return merged
+
+
+def send_message(sock: socket.socket, payload: bytes):
+    sock.sendall(len(payload).to_bytes(HEADER_SIZE, "little") + payload)
+
+
+class MessageReader:
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray(BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+
+    def read_exactly(self, size: int) -> bool:
+        received = 0
+        while received < size:
+            chunk = self.sock.recv_into(self.view[received:size])
+            if not chunk:
+                return False
+            received += chunk
+        return True
+
+    def read_message(self) -> Optional[memoryview]:
+        if not self.read_exactly(HEADER_SIZE):
+            return None
+
+        size = int.from_bytes(self.view[:HEADER_SIZE], "little")
+        if size > len(self.buffer):
+            self.view.release()
+            self.buffer = bytearray(max(size, len(self.buffer) * 2))
+            self.view = memoryview(self.buffer)
+
+        if not self.read_exactly(size):
+            return None
+        return self.view[:size]
+
+
+def step_enemies(
+    pos: np.ndarray,
+    angle: np.ndarray,
+    speed: np.ndarray,
+    width: float,
+    height: float,
+    rand_u: np.ndarray,
+    rand_jitter: np.ndarray,
+):
+    pos[:, 0] += speed * np.cos(angle)
+    pos[:, 1] += speed * np.sin(angle)
+
+    hit_x = (pos[:, 0] <= 20) | (pos[:, 0] >= width - 20)
+    np.subtract(np.pi, angle, out=angle, where=hit_x)
+    hit_y = (pos[:, 1] <= 20) | (pos[:, 1] >= height - 20)
+    np.negative(angle, out=angle, where=hit_y)
+
+    jitter = rand_u < 0.01
+    angle[jitter] += rand_jitter[jitter]
+
+
+def step_bullets(
+    pos: np.ndarray,
+    velocity: np.ndarray,
+    bounds: np.ndarray,
+    inside: np.ndarray,
+    alive: np.ndarray,
+):
+    pos += velocity
+    np.less_equal(pos, bounds, out=inside)
+    np.greater_equal(pos, 0, out=inside, where=inside)
+    np.logical_and(inside[:, 0], inside[:, 1], out=alive)
+
+
+def nearest_targets(
+    pos: np.ndarray, player_pos: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    diff = player_pos[None] - pos[:, None]
+    dist_sq = np.einsum("ijk,ijk->ij", diff, diff)
+    nearest = dist_sq.argmin(1)
+    return nearest, dist_sq[np.arange(len(pos)), nearest]
+
+
+def first_hits(
+    points: np.ndarray, targets: np.ndarray, radius_sq
+) -> Tuple[np.ndarray, np.ndarray]:
+    diff = points[:, None] - targets[None]
+    hits = np.einsum("ijk,ijk->ij", diff, diff) < radius_sq
+    rows, cols = np.nonzero(hits)
+    rows, first = np.unique(rows, return_index=True)
+    return rows, cols[first]
+
+
+def resolve_hits(
+    health: np.ndarray, targets: np.ndarray, damage: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(targets, kind="stable")
+    ordered = targets[order]
+    damage = damage[order].astype(np.int64)
+    dealt = np.cumsum(damage)
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    group = np.repeat(starts, np.diff(np.r_[starts, len(ordered)]))
+    before = dealt - damage - (dealt[group] - damage[group])
+    remaining = health[ordered] - before
+
+    landed = np.empty(len(targets), np.bool_)
+    killed = np.empty(len(targets), np.bool_)
+    landed[order] = remaining > 0
+    killed[order] = (remaining > 0) & (remaining <= damage)
+    return landed, killed
+
+
+def morton_codes(cells: np.ndarray) -> np.ndarray:
+    cells = np.clip(cells, 0, 0xFFFF).astype(np.uint32)
+    cells = (cells | (cells << 8)) & 0x00FF00FF
+    cells = (cells | (cells << 4)) & 0x0F0F0F0F
+    cells = (cells | (cells << 2)) & 0x33333333
+    cells = (cells | (cells << 1)) & 0x55555555
+    return cells[..., 0] | (cells[..., 1] << 1)
+
+
+def player_positions(players: List[Dict]) -> np.ndarray:
+    return np.fromiter(
+        (coord for player in players for coord in player["pos"][:2]),
+        np.float32,
+        2 * len(players),
+    ).reshape(-1, 2)
+
+
+def points_within(points: np.ndarray, center, radius: float) -> np.ndarray:
+    offset = points - np.array(center[:2], np.float32)
+    return np.einsum("ij,ij->i", offset, offset) < radius * radius
+
+
+def compact(arrays, mask: np.ndarray) -> int:
+    dead = np.flatnonzero(~mask)
+    if not dead.size:
+        return len(mask)
+
+    first = int(dead[0])
+    survivors = first + np.flatnonzero(mask[first:])
+    remaining = first + len(survivors)
+    for array in arrays:
+        array[first:remaining] = array[survivors]
+    return remaining
+
+
+def aligned_zeros(shape, dtype, alignment: int = CACHE_LINE) -> np.ndarray:
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.zeros(nbytes + alignment, np.uint8)
+    offset = -raw.ctypes.data % alignment
+    return raw[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+def menu_bubbles(
+    t: float, width: int, height: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    xs = width // 2 + np.cos(t * 0.5 + MENU_BUBBLE_INDEX * 0.5) * (width // 3)
+    ys = height // 2 + np.sin(t * 0.5 + MENU_BUBBLE_INDEX * 0.7) * (
+        height // 3
+    )
+    sizes = 20 + 10 * np.sin(t + MENU_BUBBLE_INDEX)
+    alphas = (128 + 64 * np.sin(t * 0.3 + MENU_BUBBLE_INDEX * 0.2)).astype(
+        np.int32
+    )
+    return xs, ys, sizes, alphas
+
+
+class SpatialGrid:
+
+    def __init__(self, pos: np.ndarray, radius: np.ndarray):
+        self.cell_size = max(float(radius.max(initial=0)) * 2, 1.0)
+        keys = morton_codes(self.cells(pos))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.pos = pos[self.order]
+        self.radius_sq = (radius * radius)[self.order]
+
+    def __len__(self) -> int:
+        return len(self.pos)
+
+    def cells(self, points: np.ndarray) -> np.ndarray:
+        return (points // self.cell_size).astype(np.int64) + 1
+
+    def first_hits(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probes = morton_codes(
+            self.cells(points)[:, None] + GRID_NEIGHBORS[None]
+        ).ravel()
+        lo = np.searchsorted(self.keys, probes, "left")
+        counts = np.searchsorted(self.keys, probes, "right") - lo
+        total = int(counts.sum())
+        if not total:
+            empty = np.empty(0, np.int64)
+            return empty, empty
+
+        rows = np.repeat(np.arange(len(probes)) // len(GRID_NEIGHBORS), counts)
+        starts = np.cumsum(counts) - counts
+        slots = np.repeat(lo - starts, counts) + np.arange(total)
+
+        diff = points[rows] - self.pos[slots]
+        hits = np.einsum("ij,ij->i", diff, diff) < self.radius_sq[slots]
+        rows, cols = rows[hits], self.order[slots[hits]]
+        order = np.lexsort((cols, rows))
+        rows, first = np.unique(rows[order], return_index=True)
+        return rows, cols[order][first]
+
+
+class BulletStore:
+
+    fields = ("pos", "velocity", "angle", "penetration", "damage", "owner")
+
+    def __init__(self, capacity: int = SERVER_BULLET_CAPACITY):
+        self.count = 0
+        self.pos = aligned_zeros((capacity, 2), np.float32)
+        self.velocity = aligned_zeros((capacity, 2), np.float32)
+        self.angle = aligned_zeros(capacity, np.float32)
+        self.penetration = aligned_zeros(capacity, np.int16)
+        self.damage = aligned_zeros(capacity, np.int16)
+        self.owner = aligned_zeros(capacity, np.int32)
+        self.records = np.zeros(capacity, BULLET_DTYPE)
+        self.inside = aligned_zeros((capacity, 2), np.bool_)
+        self.alive = aligned_zeros(capacity, np.bool_)
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, extra: int):
+        capacity = len(self.angle)
+        needed = self.count + extra
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+        for name in self.fields:
+            array = getattr(self, name)
+            grown = aligned_zeros((capacity,) + array.shape[1:], array.dtype)
+            grown[: self.count] = array[: self.count]
+            setattr(self, name, grown)
+        self.records = np.zeros(capacity, BULLET_DTYPE)
+        self.inside = aligned_zeros((capacity, 2), np.bool_)
+        self.alive = aligned_zeros(capacity, np.bool_)
+
+    def extend(self, pos, angle, speed, penetration, damage, owner):
+        count = len(angle)
+        self.reserve(count)
+
+        start, end = self.count, self.count + count
+        self.pos[start:end] = pos
+        self.angle[start:end] = angle
+        self.velocity[start:end, 0] = speed * np.cos(self.angle[start:end])
+        self.velocity[start:end, 1] = speed * np.sin(self.angle[start:end])
+        self.penetration[start:end] = penetration
+        self.damage[start:end] = damage
+        self.owner[start:end] = owner
+        self.count = end
+
+    def append(
+        self, pos, angle, speed, penetration, damage, owner, direction=None
+    ):
+        if direction is None:
+            direction = (math.cos(angle), math.sin(angle))
+        self.reserve(1)
+
+        index = self.count
+        self.pos[index] = pos
+        self.angle[index] = angle
+        self.velocity[index] = (speed * direction[0], speed * direction[1])
+        self.penetration[index] = penetration
+        self.damage[index] = damage
+        self.owner[index] = owner
+        self.count = index + 1
+
+    def step(self, width: float, height: float) -> np.ndarray:
+        n = self.count
+        alive = self.alive[:n]
+        step_bullets(
+            self.pos[:n],
+            self.velocity[:n],
+            np.array((width, height), np.float32),
+            self.inside[:n],
+            alive,
+        )
+        return alive
+
+    def keep(self, mask: np.ndarray):
+        self.count = compact(
+            [getattr(self, name) for name in self.fields], mask
+        )
+
+    def pack(self) -> bytes:
+        n = self.count
+        records = self.records[:n]
+        records["x"] = self.pos[:n, 0]
+        records["y"] = self.pos[:n, 1]
+        records["angle"] = self.angle[:n]
+        records["penetration"] = self.penetration[:n]
+        records["damage"] = self.damage[:n]
+        records["owner"] = self.owner[:n]
+        return records.tobytes()
+
+
+class EnemyStore:
+
+    def __init__(self, count: int, difficulty: str = "normal"):
+        self.pos = np.zeros((count, 2), np.float32)
+        self.angle = np.zeros(count, np.float32)
+        self.speed = np.zeros(count, np.float32)
+        self.health = np.zeros(count, np.int16)
+        self.max_health = np.zeros(count, np.int16)
+        self.fire_timer = np.zeros(count, np.int16)
+        self.size = np.zeros(count, np.float32)
+        self.radius_sq = np.zeros(count, np.float32)
+        self.type = np.zeros(count, np.uint8)
+        self.records = np.zeros(count, ENEMY_DTYPE)
+        for index, enemy in enumerate(spawn_enemies(count, difficulty)):
+            self.store(index, enemy)
+
+    def __len__(self) -> int:
+        return len(self.angle)
+
+    def respawn(self, index: int, difficulty: str = "normal"):
+        self.store(index, spawn_enemy(difficulty))
+
+    def store(self, index: int, enemy: Dict):
+        self.pos[index] = enemy["pos"]
+        self.angle[index] = enemy["angle"]
+        self.speed[index] = enemy["speed"]
+        self.health[index] = enemy["health"]
+        self.max_health[index] = enemy["max_health"]
+        self.fire_timer[index] = enemy["fire_timer"]
+        self.size[index] = enemy["size"]
+        self.radius_sq[index] = enemy["size"] ** 2
+        self.type[index] = ENEMY_TYPES.index(enemy["type"])
+
+    def pack(self) -> bytes:
+        records = self.records
+        records["x"] = self.pos[:, 0]
+        records["y"] = self.pos[:, 1]
+        records["angle"] = self.angle
+        records["health"] = self.health
+        records["max_health"] = self.max_health
+        records["size"] = self.size
+        records["type"] = self.type
+        return records.tobytes()
+
+    def update(
+        self, player_pos: np.ndarray, bullets: BulletStore, damage: float
+    ) -> np.ndarray:
+        pos = self.pos
+        angle = self.angle
+        count = len(angle)
+
+        step_enemies(
+            pos,
+            angle,
+            self.speed,
+            WIDTH,
+            HEIGHT,
+            RNG.random(count, dtype=np.float32),
+            RNG.random(count, dtype=np.float32) - 0.5,
+        )
+
+        self.fire_timer -= 1
+        firing = self.fire_timer <= 0
+        self.fire_timer[firing] = RNG.integers(
+            ENEMY_FIRE_RATE * 4 // 5,
+            ENEMY_FIRE_RATE * 6 // 5 + 1,
+            np.count_nonzero(firing),
+            np.int16,
+        )
+
+        if not len(player_pos):
+            return NO_INDICES
+
+        nearest, min_dist_sq = nearest_targets(pos, player_pos)
+        turning = RNG.random(count, dtype=np.float32) < 0.05
+        in_range = firing & (min_dist_sq < 400 * 400)
+
+        aiming = np.flatnonzero(turning | in_range)
+        if not aiming.size:
+            return NO_INDICES
+
+        target = player_pos[nearest[aiming]] - pos[aiming]
+        target_angle = np.arctan2(target[:, 1], target[:, 0])
+
+        turn = turning[aiming]
+        turners = aiming[turn]
+        angle_diff = target_angle[turn]
+        angle_diff -= angle[turners]
+        angle_diff += np.pi
+        np.remainder(angle_diff, TWO_PI, out=angle_diff)
+        angle_diff -= np.pi
+        angle[turners] += angle_diff * 0.1
+
+        shoot = in_range[aiming]
+        shooting = aiming[shoot]
+        if not shooting.size:
+            return shooting
+
+        inaccuracy = np.minimum(0.2, np.sqrt(min_dist_sq[shooting]) / 2000)
+        aim = target_angle[shoot] + inaccuracy * (
+            2 * RNG.random(shooting.size, dtype=np.float32) - 1
+        )
+        bullets.extend(
+            pos[shooting],
+            aim,
+            ENEMY_BULLET_SPEED,
+            1,
+            damage,
+            -1,
+        )
+        return shooting
+
+
+class MessageBuffer:
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self.buffer += data
+        messages = []
+        while len(self.buffer) >= HEADER_SIZE:
+            size = int.from_bytes(self.buffer[:HEADER_SIZE], "little")
+            end = HEADER_SIZE + size
+            if len(self.buffer) < end:
+                break
+            messages.append(bytes(self.buffer[HEADER_SIZE:end]))
+            del self.buffer[:end]
+        return messages
+
+
+class ClientConnection:
+    __slots__ = (
+        "socket",
+        "buffer",
+        "outbox",
+        "events",
+        "connected",
+        "player_id",
+        "last_state",
+        "state_version",
+        "messages_sent",
+    )
+
+    def __init__(self, sock: socket.socket):
+        self.socket = sock
+        self.buffer = MessageBuffer()
+        self.outbox = bytearray()
+        self.events = selectors.EVENT_READ
+        self.connected = True
+        self.player_id = None
+        self.last_state = None
+        self.state_version = -1
+        self.messages_sent = 0
+
+
 class NetworkClient:
 
     def __init__(self, host: str, port: int):
@@ -650,29 +1565,39 @@ class NetworkClient:
         self.port = port
         self.socket = None
         self.connected = False
-        self.player_id = str(random.randint(1000, 9999))
+        self.owner_id = random.randint(1000, 9999)
+        self.player_id = str(self.owner_id)
         self.game_state = {
             "players": {},
-            "enemies": [],
-            "bullets": [],
+            "enemies": np.empty(0, ENEMY_DTYPE),
+            "bullets": np.empty(0, BULLET_DTYPE),
             "powerups": [],
         }
         self.receive_thread = None
+        self.send_thread = None
+        self.outgoing = None
+        self.outgoing_lock = threading.Lock()
+        self.send_ready = threading.Event()
         self.last_received = time.time()
         self.ping = 0
 
     def connect(self) -> bool:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            configure_socket(self.socket)
             self.socket.connect((self.host, self.port))
             self.connected = True
 
-            self.socket.send(self.player_id.encode())
+            send_message(self.socket, self.player_id.encode())
 
             self.receive_thread = threading.Thread(target=self.receive_data)
             self.receive_thread.daemon = True
             self.receive_thread.start()
 
+            self.send_thread = threading.Thread(target=self.send_pending)
+            self.send_thread.daemon = True
+            self.send_thread.start()
+
             logger.info(f"Client connected to {self.host}:{self.port}")
             return True
 
@@ -685,19 +1610,38 @@ class NetworkClient:
         if not self.connected:
             return
 
-        try:
-            send_time = time.time()
-            data["send_time"] = send_time
-            self.socket.send(pickle.dumps(data))
-        except Exception as e:
-            logger.error(f"Send error: {e}")
-            self.connected = False
+        with self.outgoing_lock:
+            pending = self.outgoing
+            if pending is not None and pending.get("new_bullets"):
+                data["new_bullets"] = pending["new_bullets"] + list(
+                    data.get("new_bullets", [])
+                )
+            self.outgoing = data
+        self.send_ready.set()
+
+    def send_pending(self):
+        while self.connected:
+            self.send_ready.wait()
+            self.send_ready.clear()
+
+            with self.outgoing_lock:
+                data, self.outgoing = self.outgoing, None
+            if data is None or not self.connected:
+                continue
+
+            try:
+                data["send_time"] = time.time()
+                send_message(self.socket, encode_message(data))
+            except Exception as e:
+                logger.error(f"Send error: {e}")
+                self.connected = False
 
     def receive_data(self):
+        reader = MessageReader(self.socket)
         while self.connected:
             try:
-                data = self.socket.recv(BUFFER_SIZE)
-                if not data:
+                data = reader.read_message()
+                if data is None:
                     self.connected = False
                     logger.warning("Connection closed by server")
                     break
@@ -705,7 +1649,9 @@ class NetworkClient:
                 receive_time = time.time()
                 self.last_received = receive_time
 
-                self.game_state = pickle.loads(data)
+                self.game_state = apply_state_delta(
+                    self.game_state, decode_message(data)
+                )
 
                 if "send_time" in self.game_state:
                     self.ping = int(
@@ -719,6 +1665,7 @@ class NetworkClient:
 
     def close(self):
         self.connected = False
+        self.send_ready.set()
         if self.socket:
             try:
                 self.socket.close()
@@ -733,25 +1680,38 @@ class GameServer:
         self.host = host
         self.port = port
         self.socket = None
+        self.selector = None
         self.running = False
         self.clients = {}
+        self.difficulty = "normal"
+
+        self.enemies = EnemyStore(NUM_ENEMIES, self.difficulty)
+        self.bullets = BulletStore()
+
         self.game_state = {
             "players": {},
-            "enemies": [spawn_enemy() for _ in range(NUM_ENEMIES)],
-            "bullets": [],
+            "enemies": self.enemies.pack(),
+            "bullets": self.bullets.pack(),
             "powerups": [],
             "send_time": time.time(),
         }
-        self.last_powerup_time = time.time()
+        self.last_powerup_time = time.monotonic()
         self.powerup_interval = 10
-        self.difficulty = "normal"
+
+        self.player_pos = np.zeros((0, 2), np.float32)
+        self.state_version = 0
+        self.packed_state = None
+        self.keyframe_payload = None
+        self.publish_state()
 
     def start(self) -> bool:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.bind((self.host, self.port))
             self.socket.listen(5)
-            self.socket.settimeout(0.5)
+            self.socket.setblocking(False)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ)
             self.running = True
 
             logger.info(f"Server started on {self.host}:{self.port}")
@@ -767,349 +1727,351 @@ class GameServer:
             return False
 
     def run(self):
+        tick = 1 / SERVER_TICK_RATE
+        next_tick = time.monotonic()
+
         while self.running:
             try:
-                client_socket, addr = self.socket.accept()
-                logger.info(f"New connection from {addr}")
-
-                player_id = client_socket.recv(1024).decode()
-
-                client_thread = threading.Thread(
-                    target=self.handle_client, args=(client_socket, player_id)
-                )
-                client_thread.daemon = True
-                client_thread.start()
-
-                self.clients[player_id] = client_socket
-
-            except socket.timeout:
-                pass
+                timeout = max(0.0, next_tick - time.monotonic())
+                for key, mask in self.selector.select(timeout):
+                    connection = key.data
+                    if connection is None:
+                        self.accept_client()
+                        continue
+                    if mask & selectors.EVENT_WRITE and connection.connected:
+                        self.flush_client(connection)
+                    if mask & selectors.EVENT_READ and connection.connected:
+                        self.read_client(connection)
             except Exception as e:
-                logger.error(f"Accept error: {e}")
+                logger.error(f"Server loop error: {e}")
 
-            self.update_game_state()
+            now = time.monotonic()
+            if now >= next_tick:
+                self.update_game_state()
+                next_tick += tick
+                if next_tick < now:
+                    next_tick = now + tick
 
-            time.sleep(0.01)
+        self.selector.close()
 
-    def handle_client(self, client_socket, player_id: str):
+    def accept_client(self):
         try:
-            client_socket.send(pickle.dumps(self.game_state))
-
-            while self.running:
-                try:
-                    data = client_socket.recv(BUFFER_SIZE)
-                    if not data:
-                        break
-
-                    player_data = pickle.loads(data)
-
-                    self.game_state["players"][player_id] = player_data
-
-                    if (
-                        "new_bullets" in player_data
-                        and player_data["new_bullets"]
-                    ):
-                        for bullet in player_data["new_bullets"]:
-                            self.game_state["bullets"].append(
-                                {
-                                    "pos": bullet[:2],
-                                    "angle": bullet[2],
-                                    "penetration": bullet[3],
-                                    "damage": bullet[4],
-                                    "owner": player_id,
-                                }
-                            )
-
-                    self.game_state["send_time"] = time.time()
-                    if "send_time" in player_data:
-                        self.game_state["last_ping"] = (
-                            time.time() - player_data["send_time"]
-                        )
-
-                    client_socket.send(pickle.dumps(self.game_state))
+            client_socket, addr = self.socket.accept()
+        except BlockingIOError:
+            return
 
-                except Exception as e:
-                    logger.error(f"Client handler error: {e}")
-                    break
+        logger.info(f"New connection from {addr}")
+        configure_socket(client_socket)
+        client_socket.setblocking(False)
+        self.selector.register(
+            client_socket,
+            selectors.EVENT_READ,
+            ClientConnection(client_socket),
+        )
 
+    def read_client(self, connection: ClientConnection):
+        try:
+            data = connection.socket.recv(BUFFER_SIZE)
+        except (BlockingIOError, socket.timeout):
+            return
         except Exception as e:
             logger.error(f"Client handler error: {e}")
-        finally:
-            if player_id in self.clients:
-                del self.clients[player_id]
-            if player_id in self.game_state["players"]:
-                del self.game_state["players"][player_id]
-            try:
-                client_socket.close()
-            except:
-                pass
-            logger.info(f"Client {player_id} disconnected")
+            data = b""
 
-    def spawn_powerup(self):
-        if len(self.game_state["powerups"]) >= 5:
+        if not data:
+            self.drop_client(connection)
             return
 
-        pos = [random.randint(50, WIDTH - 50), random.randint(50, HEIGHT - 50)]
-
-        types = ["health", "shield", "speed", "damage", "xp"]
-        weights = [0.25, 0.2, 0.2, 0.2, 0.15]
-        powerup_type = random.choices(types, weights=weights)[0]
+        for message in connection.buffer.feed(data):
+            if not connection.connected:
+                return
+            try:
+                if connection.player_id is None:
+                    connection.player_id = message.decode()
+                    self.clients[connection.player_id] = connection.socket
+                    self.send_state(connection)
+                else:
+                    self.handle_message(connection, message)
+            except Exception as e:
+                logger.error(f"Client handler error: {e}")
+                self.drop_client(connection)
+                return
 
-        self.game_state["powerups"].append(
-            {"pos": pos, "type": powerup_type, "creation_time": time.time()}
-        )
+    def handle_message(self, connection: ClientConnection, data: bytes):
+        player_id = connection.player_id
+        player_data = decode_message(data)
+
+        self.game_state["players"][player_id] = player_data
+
+        if player_data.get("new_bullets"):
+            shots = np.asarray(player_data["new_bullets"], np.float32)
+            self.bullets.extend(
+                shots[:, :2],
+                shots[:, 2],
+                BULLET_SPEED,
+                shots[:, 3],
+                shots[:, 4],
+                int(player_id),
+            )
 
-    def update_game_state(self):
-        current_time = time.time()
-        self.game_state["send_time"] = current_time
+        self.game_state["send_time"] = time.time()
+        if "send_time" in player_data:
+            self.game_state["last_ping"] = (
+                time.time() - player_data["send_time"]
+            )
 
-        if current_time - self.last_powerup_time > self.powerup_interval:
-            self.spawn_powerup()
-            self.last_powerup_time = current_time
+        self.send_state(connection)
 
-        for powerup in list(self.game_state["powerups"]):
-            if current_time - powerup["creation_time"] > 30:
-                self.game_state["powerups"].remove(powerup)
+    def publish_state(self):
+        self.state_version += 1
+        self.packed_state = snapshot_state(pack_message(self.game_state))
+        self.keyframe_payload = pickle.dumps(
+            dict(self.packed_state, keyframe=True),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
 
-        for enemy in self.game_state["enemies"]:
-            enemy["pos"][0] += enemy["speed"] * math.cos(enemy["angle"])
-            enemy["pos"][1] += enemy["speed"] * math.sin(enemy["angle"])
+    def send_state(self, connection: ClientConnection):
+        if connection.state_version == self.state_version:
+            return
 
-            if enemy["pos"][0] <= 20 or enemy["pos"][0] >= WIDTH - 20:
-                enemy["angle"] = math.pi - enemy["angle"]
-            if enemy["pos"][1] <= 20 or enemy["pos"][1] >= HEIGHT - 20:
-                enemy["angle"] = -enemy["angle"]
+        if (
+            connection.last_state is None
+            or connection.messages_sent % KEYFRAME_INTERVAL == 0
+        ):
+            payload = self.keyframe_payload
+        else:
+            payload = pickle.dumps(
+                diff_state(connection.last_state, self.packed_state),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
 
-            if random.random() < 0.01:
-                enemy["angle"] += random.uniform(-0.5, 0.5)
+        connection.last_state = self.packed_state
+        connection.state_version = self.state_version
+        connection.messages_sent += 1
+        connection.outbox += len(payload).to_bytes(HEADER_SIZE, "little")
+        connection.outbox += payload
+        self.flush_client(connection)
 
-            if self.game_state["players"] and random.random() < 0.05:
-                closest_player = None
-                min_dist = float("inf")
+    def flush_client(self, connection: ClientConnection):
+        try:
+            sent = connection.socket.send(connection.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            logger.error(f"Client send error: {e}")
+            self.drop_client(connection)
+            return
+        del connection.outbox[:sent]
 
-                for player_id, player in self.game_state["players"].items():
-                    dist = math.hypot(
-                        player["pos"][0] - enemy["pos"][0],
-                        player["pos"][1] - enemy["pos"][1],
-                    )
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest_player = player
-
-                if closest_player:
-                    target_angle = math.atan2(
-                        closest_player["pos"][1] - enemy["pos"][1],
-                        closest_player["pos"][0] - enemy["pos"][0],
-                    )
-                    angle_diff = (target_angle - enemy["angle"] + math.pi) % (
-                        2 * math.pi
-                    ) - math.pi
-                    enemy["angle"] += angle_diff * 0.1
+        if len(connection.outbox) > CLIENT_BACKLOG_LIMIT:
+            logger.warning(
+                f"Client {connection.player_id} fell too far behind"
+            )
+            self.drop_client(connection)
+            return
 
-            enemy["fire_timer"] -= 1
+        events = selectors.EVENT_READ
+        if connection.outbox:
+            events |= selectors.EVENT_WRITE
+        if events != connection.events:
+            self.selector.modify(connection.socket, events, connection)
+            connection.events = events
 
-            if enemy["fire_timer"] <= 0:
-                enemy["fire_timer"] = ENEMY_FIRE_RATE * random.uniform(
-                    0.8, 1.2
-                )
+    def drop_client(self, connection: ClientConnection):
+        if not connection.connected:
+            return
+        connection.connected = False
+        player_id = connection.player_id
+        try:
+            self.selector.unregister(connection.socket)
+        except (KeyError, ValueError):
+            pass
+        if player_id in self.clients:
+            del self.clients[player_id]
+        if player_id in self.game_state["players"]:
+            del self.game_state["players"][player_id]
+        try:
+            connection.socket.close()
+        except:
+            pass
+        logger.info(f"Client {player_id} disconnected")
 
-                if self.game_state["players"]:
-                    closest_player = None
-                    min_dist = float("inf")
+    def spawn_powerup(self, now: float):
+        if len(self.game_state["powerups"]) >= 5:
+            return
 
-                    for player_id, player in self.game_state[
-                        "players"
-                    ].items():
-                        dist = math.hypot(
-                            player["pos"][0] - enemy["pos"][0],
-                            player["pos"][1] - enemy["pos"][1],
-                        )
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_player = player
-
-                    if closest_player and min_dist < 400:
-                        angle_to_player = math.atan2(
-                            closest_player["pos"][1] - enemy["pos"][1],
-                            closest_player["pos"][0] - enemy["pos"][0],
-                        )
+        pos = [random.randint(50, WIDTH - 50), random.randint(50, HEIGHT - 50)]
 
-                        inaccuracy = min(0.2, min_dist / 2000)
-                        angle_to_player += random.uniform(
-                            -inaccuracy, inaccuracy
-                        )
+        powerup_type = random.choices(
+            POWERUP_TYPES, cum_weights=POWERUP_CUM_WEIGHTS
+        )[0]
 
-                        self.game_state["bullets"].append(
-                            {
-                                "pos": [enemy["pos"][0], enemy["pos"][1]],
-                                "angle": angle_to_player,
-                                "penetration": 1,
-                                "damage": DIFFICULTY_SETTINGS[self.difficulty][
-                                    "enemy_damage"
-                                ],
-                                "owner": "enemy",
-                            }
-                        )
+        self.game_state["powerups"].append(
+            {"pos": pos, "type": powerup_type, "creation_time": now}
+        )
 
-        for bullet in list(self.game_state["bullets"]):
-            speed = (
-                ENEMY_BULLET_SPEED
-                if bullet["owner"] == "enemy"
-                else BULLET_SPEED
+    def update_game_state(self):
+        game_state = self.game_state
+        players_by_id = game_state["players"]
+        settings = DIFFICULTY_SETTINGS[self.difficulty]
+        kill_xp = 10 * settings["xp_multiplier"]
+
+        now = time.monotonic()
+        game_state["send_time"] = time.time()
+
+        if now - self.last_powerup_time > self.powerup_interval:
+            self.spawn_powerup(now)
+            self.last_powerup_time = now
+
+        powerups = [
+            powerup
+            for powerup in game_state["powerups"]
+            if now - powerup["creation_time"] <= 30
+        ]
+        game_state["powerups"] = powerups
+
+        players = list(players_by_id.values())
+        self.player_pos = player_positions(players)
+        self.enemies.update(
+            self.player_pos, self.bullets, settings["enemy_damage"]
+        )
+
+        bullets = self.bullets
+        in_bounds = bullets.step(WIDTH, HEIGHT)
+        n = len(bullets)
+        pos = bullets.pos[:n]
+        alive = in_bounds.copy()
+        owners = bullets.owner[:n]
+        damages = bullets.damage[:n].tolist()
+        penetration = bullets.penetration
+
+        enemies = self.enemies
+        kills = []
+        shots = np.flatnonzero(in_bounds & (owners >= 0))
+        if shots.size:
+            rows, targets = first_hits(
+                pos[shots], enemies.pos, enemies.radius_sq
+            )
+            hits = shots[rows]
+            landed, killed = resolve_hits(
+                enemies.health, targets, bullets.damage[hits]
+            )
+            hits, targets, killed = (
+                hits[landed],
+                targets[landed],
+                killed[landed],
             )
-            bullet["pos"][0] += speed * math.cos(bullet["angle"])
-            bullet["pos"][1] += speed * math.sin(bullet["angle"])
 
-            if (
-                bullet["pos"][0] < 0
-                or bullet["pos"][0] > WIDTH
-                or bullet["pos"][1] < 0
-                or bullet["pos"][1] > HEIGHT
-            ):
-                self.game_state["bullets"].remove(bullet)
-                continue
+            np.subtract.at(enemies.health, targets, bullets.damage[hits])
+            penetration[hits] -= 1
+            alive[hits] = penetration[hits] > 0
+            kills = zip(hits[killed].tolist(), targets[killed].tolist())
+
+        for i, index in kills:
+            if random.random() < 0.1:
+                powerups.append(
+                    {
+                        "pos": enemies.pos[index].tolist(),
+                        "type": random.choice(POWERUP_TYPES),
+                        "creation_time": now,
+                    }
+                )
 
-            if bullet["owner"] != "enemy":
-                for enemy in list(self.game_state["enemies"]):
-                    if (
-                        math.hypot(
-                            bullet["pos"][0] - enemy["pos"][0],
-                            bullet["pos"][1] - enemy["pos"][1],
-                        )
-                        < enemy["size"]
-                    ):
-                        enemy["health"] -= bullet["damage"]
-                        bullet["penetration"] -= 1
-
-                        if bullet["penetration"] <= 0:
-                            if bullet in self.game_state["bullets"]:
-                                self.game_state["bullets"].remove(bullet)
-
-                        if enemy["health"] <= 0:
-                            if random.random() < 0.1:
-                                self.game_state["powerups"].append(
-                                    {
-                                        "pos": [
-                                            enemy["pos"][0],
-                                            enemy["pos"][1],
-                                        ],
-                                        "type": random.choice(
-                                            [
-                                                "health",
-                                                "shield",
-                                                "speed",
-                                                "damage",
-                                                "xp",
-                                            ]
-                                        ),
-                                        "creation_time": time.time(),
-                                    }
-                                )
-
-                            self.game_state["enemies"].remove(enemy)
-                            self.game_state["enemies"].append(
-                                spawn_enemy(self.difficulty)
-                            )
+            enemies.respawn(index, self.difficulty)
 
-                            if bullet["owner"] in self.game_state["players"]:
-                                player = self.game_state["players"][
-                                    bullet["owner"]
-                                ]
-                                xp_gain = (
-                                    10
-                                    * DIFFICULTY_SETTINGS[self.difficulty][
-                                        "xp_multiplier"
-                                    ]
-                                )
-
-                                if "xp" not in player:
-                                    player["xp"] = 0
-                                if "xp_to_next_level" not in player:
-                                    player["xp_to_next_level"] = 100
-                                if "level" not in player:
-                                    player["level"] = 1
-
-                                player["xp"] += xp_gain
-
-                                if player["xp"] >= player["xp_to_next_level"]:
-                                    player["level"] += 1
-                                    player["xp"] -= player["xp_to_next_level"]
-                                    player["xp_to_next_level"] = int(
-                                        player["xp_to_next_level"] * 1.5
-                                    )
-
-                                    if "upgrade_points" not in player:
-                                        player["upgrade_points"] = 0
-                                    player["upgrade_points"] += 1
+            player = players_by_id.get(str(owners[i]))
+            if player is not None:
 
-                        break
+                if "xp" not in player:
+                    player["xp"] = 0
+                if "xp_to_next_level" not in player:
+                    player["xp_to_next_level"] = 100
+                if "level" not in player:
+                    player["level"] = 1
 
-            if bullet["owner"] == "enemy":
-                for player_id, player in self.game_state["players"].items():
-                    if (
-                        math.hypot(
-                            bullet["pos"][0] - player["pos"][0],
-                            bullet["pos"][1] - player["pos"][1],
-                        )
-                        < 20
-                    ):
-                        if "shield" in player and player["shield"] > 0:
-                            player["shield"] -= bullet["damage"]
-                            if player["shield"] < 0:
-                                player["health"] += player["shield"]
-                                player["shield"] = 0
-                        else:
-                            player["health"] -= bullet["damage"]
+                player["xp"] += kill_xp
 
-                        if bullet in self.game_state["bullets"]:
-                            self.game_state["bullets"].remove(bullet)
-                        break
+                if player["xp"] >= player["xp_to_next_level"]:
+                    player["level"] += 1
+                    player["xp"] -= player["xp_to_next_level"]
+                    player["xp_to_next_level"] = int(
+                        player["xp_to_next_level"] * 1.5
+                    )
+
+                    if "upgrade_points" not in player:
+                        player["upgrade_points"] = 0
+                    player["upgrade_points"] += 1
+
+        enemy_shots = np.flatnonzero(in_bounds & (owners < 0))
+        if enemy_shots.size and players:
+            rows, targets = first_hits(
+                pos[enemy_shots], self.player_pos, 20 * 20
+            )
+            for i, target in zip(enemy_shots[rows].tolist(), targets.tolist()):
+                player = players[target]
+                if "shield" in player and player["shield"] > 0:
+                    player["shield"] -= damages[i]
+                    if player["shield"] < 0:
+                        player["health"] += player["shield"]
+                        player["shield"] = 0
+                else:
+                    player["health"] -= damages[i]
+
+                alive[i] = False
 
-            for powerup in list(self.game_state["powerups"]):
-                for player_id, player in self.game_state["players"].items():
-                    if (
-                        math.hypot(
-                            powerup["pos"][0] - player["pos"][0],
-                            powerup["pos"][1] - player["pos"][1],
+        bullets.keep(alive)
+
+        if powerups and players:
+            rows, targets = first_hits(
+                np.array([powerup["pos"] for powerup in powerups], np.float32),
+                self.player_pos,
+                25 * 25,
+            )
+            for row, target in zip(rows.tolist(), targets.tolist()):
+                powerup = powerups[row]
+                player = players[target]
+                if powerup["type"] == "health":
+                    player["health"] = min(
+                        player["health"] + 25,
+                        player.get("max_health", 100),
+                    )
+                elif powerup["type"] == "shield":
+                    player["shield"] = 30
+                    player["shield_end_time"] = now + 10
+                elif powerup["type"] == "speed":
+                    player["movement_speed_boost"] = 1.5
+                    player["speed_end_time"] = now + 5
+                elif powerup["type"] == "damage":
+                    player["damage_boost"] = 5
+                    player["damage_end_time"] = now + 8
+                elif powerup["type"] == "xp":
+                    xp_gain = 30
+                    if "xp" not in player:
+                        player["xp"] = 0
+                    if "xp_to_next_level" not in player:
+                        player["xp_to_next_level"] = 100
+
+                    player["xp"] += xp_gain
+
+                    if player["xp"] >= player["xp_to_next_level"]:
+                        player["level"] += 1
+                        player["xp"] -= player["xp_to_next_level"]
+                        player["xp_to_next_level"] = int(
+                            player["xp_to_next_level"] * 1.5
                         )
-                        < 25
-                    ):
-                        if powerup["type"] == "health":
-                            player["health"] = min(
-                                player["health"] + 25,
-                                player.get("max_health", 100),
-                            )
-                        elif powerup["type"] == "shield":
-                            player["shield"] = 30
-                            player["shield_end_time"] = time.time() + 10
-                        elif powerup["type"] == "speed":
-                            player["movement_speed_boost"] = 1.5
-                            player["speed_end_time"] = time.time() + 5
-                        elif powerup["type"] == "damage":
-                            player["damage_boost"] = 5
-                            player["damage_end_time"] = time.time() + 8
-                        elif powerup["type"] == "xp":
-                            xp_gain = 30
-                            if "xp" not in player:
-                                player["xp"] = 0
-                            if "xp_to_next_level" not in player:
-                                player["xp_to_next_level"] = 100
-
-                            player["xp"] += xp_gain
-
-                            if player["xp"] >= player["xp_to_next_level"]:
-                                player["level"] += 1
-                                player["xp"] -= player["xp_to_next_level"]
-                                player["xp_to_next_level"] = int(
-                                    player["xp_to_next_level"] * 1.5
-                                )
-
-                                if "upgrade_points" not in player:
-                                    player["upgrade_points"] = 0
-                                player["upgrade_points"] += 1
-
-                        self.game_state["powerups"].remove(powerup)
-                        break
+
+                        if "upgrade_points" not in player:
+                            player["upgrade_points"] = 0
+                        player["upgrade_points"] += 1
+
+                powerup["consumed"] = True
+
+        game_state["powerups"] = [
+            powerup for powerup in powerups if not powerup.get("consumed")
+        ]
+        game_state["bullets"] = bullets.pack()
+        game_state["enemies"] = self.enemies.pack()
+        self.publish_state()
 
     def close(self):
         self.running = False
@@ -1133,6 +2095,7 @@ class Game:
 
     def __init__(self):
         pygame.init()
+        pygame.event.set_blocked(BLOCKED_EVENTS)
 
         self.available_colors = {
             "Blue": COLORS["BLUE"],
@@ -1167,9 +2130,9 @@ class Game:
         pygame.draw.circle(self.icon, COLORS["WHITE"], (16, 16), 8)
         pygame.display.set_icon(self.icon)
 
-        self.font = pygame.font.Font(None, 24)
-        self.title_font = pygame.font.Font(None, 48)
-        self.subtitle_font = pygame.font.Font(None, 36)
+        self.font = get_font(24)
+        self.title_font = get_font(48)
+        self.subtitle_font = get_font(36)
 
         self.running = True
         self.current_screen = "loading"
@@ -1177,17 +2140,49 @@ class Game:
         self.show_settings_menu = False
         self.show_help_menu = False
         self.clock = pygame.time.Clock()
+        self.frame_debt = 0.0
         self.fps_display = True
+        self.cheap_dim = False
         self.mouse_sensitivity = 1.0
         self.sound_volume = 0.7
         self.music_volume = 0.5
         self.particle_effects = True
+        self.difficulty = "normal"
+        self.xp_multiplier = DIFFICULTY_SETTINGS["normal"]["xp_multiplier"]
+        self.enemy_damage = DIFFICULTY_SETTINGS["normal"]["enemy_damage"]
+
+        self.event_handlers = {
+            "main_menu": self.handle_menu_events,
+            "host": self.handle_menu_events,
+            "join": self.handle_menu_events,
+            "game": self.handle_game_events,
+        }
+        self.frame_handlers = {
+            "loading": self.loading_frame,
+            "game": self.game_frame,
+            "main_menu": self.main_menu_frame,
+            "host": self.host_frame,
+            "join": self.join_frame,
+        }
+
+        self.settings_queue = queue.Queue()
+        self.settings_thread = threading.Thread(
+            target=self.write_settings, daemon=True
+        )
+        self.settings_thread.start()
 
         self.setup_loading_screen()
 
-        self.frame_times = []
-        self.last_update_time = time.time()
-        self.update_interval = 1.0
+        self.now = time.monotonic()
+        self.menu_state = None
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+        self.keys = pygame.key.get_pressed()
+        self.enemy_palette = {
+            "normal": COLORS["RED"],
+            "fast": COLORS["ORANGE"],
+            "tank": COLORS["MAGENTA"],
+        }
 
     def setup_loading_screen(self):
         self.loading_screen = LoadingScreen(
@@ -1218,12 +2213,29 @@ class Game:
 
     def initialize_particles(self):
         self.particles = ParticleSystem()
+        self.bind_particle_spawner()
         self.powerups = []
-        self.active_effects = {}
+        self.remote_powerups = {}
+        self.powerup_pool = [
+            PowerUp((0, 0), "health") for _ in range(POWERUP_POOL_SIZE)
+        ]
+        self.overlay_cache = {}
+        self.panel_cache = {}
+        self.text_cache = OrderedDict()
+        self.hud_surfaces = None
+        self.dirty_rects = None
+        self.stat_bar_cache = {}
+        self.shield_end_time = 0
+        self.speed_boost_end_time = 0
+        self.damage_boost_end_time = 0
+        self.live_effects = []
         self.difficulty = "normal"
-        time.sleep(0.1)
 
     def initialize_menus(self):
+        self.overlay_cache.clear()
+        for alpha in (128, 180):
+            self.dim_overlay(alpha)
+
         menu_width = 450
         menu_height = 600
         button_width = 350
@@ -1365,9 +2377,17 @@ class Game:
                 hover_color=(100, 150, 255),
                 border_radius=5,
             ),
+            "dim": Button(
+                right_column_x,
+                HEIGHT // 2 - 100 + row_height * 4,
+                200,
+                40,
+                f"Fast Dim: {'ON' if self.cheap_dim else 'OFF'}",
+                border_radius=5,
+            ),
             "back": Button(
                 WIDTH // 2 - 100,
-                HEIGHT // 2 + 180,
+                HEIGHT // 2 + 230,
                 200,
                 50,
                 "Back",
@@ -1471,8 +2491,6 @@ class Game:
 
         self.setup_cosmetics_menu()
 
-        time.sleep(0.3)
-
         menu_width, menu_height = 500, 500
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
@@ -1514,15 +2532,12 @@ class Game:
             border_radius=10,
         )
 
-        time.sleep(0.3)
-
     def prepare_network(self):
         self.client = NetworkClient(SERVER_HOST, SERVER_PORT)
         self.server = None
         self.multiplayer_mode = False
         self.is_host = False
         self.new_bullets = []
-        time.sleep(0.2)
 
     def load_settings(self):
         try:
@@ -1534,6 +2549,7 @@ class Game:
                 self.music_volume = settings.get("music_volume", 0.5)
                 self.particle_effects = settings.get("particle_effects", True)
                 self.fps_display = settings.get("fps_display", True)
+                self.cheap_dim = settings.get("cheap_dim", False)
 
                 color_name = settings.get("player_color_name", "Blue")
                 if color_name in self.available_colors:
@@ -1543,24 +2559,49 @@ class Game:
                     ]
         except:
             pass
-        time.sleep(0.2)
 
     def save_settings(self):
-        settings = {
-            "fullscreen": self.fullscreen,
-            "mouse_sensitivity": self.mouse_sensitivity,
-            "sound_volume": self.sound_volume,
-            "music_volume": self.music_volume,
-            "particle_effects": self.particle_effects,
-            "fps_display": self.fps_display,
-            "player_color_name": self.player_color_name,
-        }
+        self.settings_queue.put(
+            {
+                "fullscreen": self.fullscreen,
+                "mouse_sensitivity": self.mouse_sensitivity,
+                "sound_volume": self.sound_volume,
+                "music_volume": self.music_volume,
+                "particle_effects": self.particle_effects,
+                "fps_display": self.fps_display,
+                "cheap_dim": self.cheap_dim,
+                "player_color_name": self.player_color_name,
+            }
+        )
 
-        try:
-            with open("settings.pkl", "wb") as f:
-                pickle.dump(settings, f)
-        except Exception as e:
-            logger.error(f"Error saving settings: {e}")
+    def write_settings(self):
+        running = True
+        while running:
+            settings = self.settings_queue.get()
+            while True:
+                try:
+                    pending = self.settings_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    running = False
+                else:
+                    settings = pending
+            if settings is None:
+                return
+
+            tmp = None
+            try:
+                with tempfile.NamedTemporaryFile(
+                    "wb", dir=".", prefix="settings.", delete=False
+                ) as tmp:
+                    pickle.dump(settings, tmp)
+                os.replace(tmp.name, "settings.pkl")
+            except Exception as e:
+                logger.error(f"Error saving settings: {e}")
+                if tmp is not None:
+                    with contextlib.suppress(OSError):
+                        os.unlink(tmp.name)
 
     def load_sounds(self):
         try:
@@ -1583,16 +2624,8 @@ class Game:
 
         if pygame.mixer.get_init():
             try:
-                import os
-
                 sounds_dir = "assets/sounds"
-                if not os.path.exists("assets"):
-                    os.makedirs("assets")
-                if not os.path.exists(sounds_dir):
-                    os.makedirs(sounds_dir)
-                    logger.warning(
-                        f"Created missing sounds directory: {sounds_dir}"
-                    )
+                os.makedirs(sounds_dir, exist_ok=True)
 
                 sound_files = {
                     "shoot": os.path.join(sounds_dir, "shoot.wav"),
@@ -1634,8 +2667,6 @@ class Game:
 
         self.load_and_play_background_music()
 
-        time.sleep(0.5)
-
     def load_and_play_background_music(self):
         try:
             import os
@@ -1718,11 +2749,43 @@ class Game:
                 logger.warning(f"Error playing sound {sound_name}: {e}")
 
     def setup_discord_rpc(self):
+        self.rpc = None
+        self.rpc_status = None
+        self.rpc_key = None
+        self.rpc_wake = threading.Event()
+        threading.Thread(target=self.run_discord_rpc, daemon=True).start()
+
+    def run_discord_rpc(self):
+        self.connect_discord_rpc()
+
+        while self.rpc and self.running:
+            self.rpc_wake.wait(DISCORD_RPC_INTERVAL)
+            self.rpc_wake.clear()
+
+            status = self.rpc_status
+            if status is None or not self.running:
+                continue
+
+            details, state = status
+            try:
+                self.rpc.update(
+                    details=details,
+                    state=state,
+                    large_image="https://i.imgur.com/vn4pYBH.png",
+                    large_text="Bulletverse.io",
+                    small_image="https://th.bing.com/th/id/R.da61fa152c102c46c16786b9f79402f8?rik=l5kvYddcePaDtw&pid=ImgRaw&r=0",
+                    small_text="https://discord.gg/XVN6mYv5AJ",
+                    start=int(time.time()),
+                )
+            except:
+                pass
+
+    def connect_discord_rpc(self):
         try:
             client_id = "1345600362706374717"
-            self.rpc = Presence(client_id)
-            self.rpc.connect()
-            self.rpc.update(
+            rpc = Presence(client_id)
+            rpc.connect()
+            rpc.update(
                 details="Game was created here:",
                 state=".gg/XVN6mYv5AJ",
                 large_image="https://i.imgur.com/vn4pYBH.png",
@@ -1731,11 +2794,10 @@ class Game:
                 small_text="https://discord.gg/XVN6mYv5AJ",
                 start=int(time.time()),
             )
+            self.rpc = rpc
             logger.info("Discord RPC connected")
         except:
-            self.rpc = None
             logger.warning("Discord RPC failed to connect")
-        time.sleep(0.3)
 
     def setup_cosmetics_menu(self):
         menu_width, menu_height = 500, 500
@@ -1748,6 +2810,15 @@ class Game:
         buttons_per_row = 4
 
         color_names = list(self.available_colors.keys())
+        self.color_grid = (
+            menu_x + 50,
+            menu_y + 120,
+            button_width + button_margin,
+            buttons_per_row,
+            color_names,
+        )
+        self.color_button_surface = None
+        self.color_button_key = None
         rows = (len(color_names) + buttons_per_row - 1) // buttons_per_row
 
         for i, color_name in enumerate(color_names):
@@ -1778,73 +2849,226 @@ class Game:
             hover_color=(255, 100, 100),
             border_radius=10,
         )
-        time.sleep(0.2)
 
-    def draw_cosmetics_menu(self):
-        if not self.show_cosmetics_menu:
-            return
+    def build_hud_surfaces(self) -> Dict[str, pygame.Surface]:
+        panel = pygame.Surface((220, 180))
+        panel.fill((240, 240, 240))
+        pygame.draw.rect(panel, COLORS["DARK_GRAY"], (0, 0, 220, 180), 2)
+
+        surfaces = {"panel": panel}
+        for name, color, height in (
+            ("bar", COLORS["DARK_GRAY"], 15),
+            ("xp", COLORS["BLUE"], 15),
+            ("health", COLORS["RED"], 15),
+            ("shield_bar", COLORS["DARK_GRAY"], 10),
+            ("shield", (100, 150, 255), 10),
+        ):
+            surfaces[name] = pygame.Surface((200, height))
+            surfaces[name].fill(color)
+        return {name: surface.convert() for name, surface in surfaces.items()}
+
+    def stat_bar(self, stat_level: int) -> pygame.Surface:
+        bar = self.stat_bar_cache.get(stat_level)
+        if bar is None:
+            bar = pygame.Surface(
+                ((MAX_STAT_LEVEL - 1) * 20 + 15, 20), pygame.SRCALPHA
+            )
+            for i in range(MAX_STAT_LEVEL):
+                rect = pygame.Rect(i * 20, 0, 15, 20)
+                color = COLORS["BLUE"] if i < stat_level else COLORS["GRAY"]
+                pygame.draw.rect(bar, color, rect, border_radius=3)
+                pygame.draw.rect(
+                    bar, COLORS["BLACK"], rect, 1, border_radius=3
+                )
+            bar = self.stat_bar_cache[stat_level] = bar.convert_alpha()
+        return bar
+
+    def render_text(
+        self, text: str, color, font: Optional[pygame.font.Font] = None
+    ) -> pygame.Surface:
+        if font is None:
+            font = self.font
+        key = (font, text, color)
+        cache = self.text_cache
+        surface = cache.get(key)
+        if surface is None:
+            surface = cache[key] = display_format(
+                font.render(text, True, color)
+            )
+            if len(cache) > TEXT_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return surface
 
-        if not hasattr(self, "cosmetics_overlay"):
-            self.cosmetics_overlay = pygame.Surface(
-                (WIDTH, HEIGHT), pygame.SRCALPHA
+    def text_part_blits(
+        self,
+        text: str,
+        color,
+        pos: Tuple[int, int],
+        anchor: str = "center",
+        font: Optional[pygame.font.Font] = None,
+    ) -> List:
+        surfaces = [
+            self.render_text(piece, color, font)
+            for piece in TEXT_PIECES.findall(text)
+        ]
+        x, y = pos
+        centered = anchor == "center"
+        if centered:
+            x -= sum(surface.get_width() for surface in surfaces) // 2
+        blits = []
+        for surface in surfaces:
+            top = y - surface.get_height() // 2 if centered else y
+            blits.append((surface, (x, top)))
+            x += surface.get_width()
+        return blits
+
+    def dim_overlay(self, alpha: int) -> pygame.Surface:
+        key = (WIDTH, HEIGHT, alpha)
+        overlay = self.overlay_cache.get(key)
+        if overlay is None:
+            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, alpha))
+            overlay = self.overlay_cache[key] = overlay.convert_alpha()
+        return overlay
+
+    def menu_panel(
+        self,
+        title: str,
+        width: int,
+        height: int,
+        labels: List[Tuple[str, Tuple[int, int, int], str, Tuple[int, int]]],
+        decorate=None,
+    ) -> pygame.Surface:
+        panel = self.panel_cache.get(title)
+        if panel is None:
+            panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.rect(
+                panel, COLORS["WHITE"], (0, 0, width, height), border_radius=15
+            )
+            pygame.draw.rect(
+                panel,
+                COLORS["BLACK"],
+                (0, 0, width, height),
+                3,
+                border_radius=15,
             )
-            self.cosmetics_overlay.fill((0, 0, 0, 128))
-        self.screen.blit(self.cosmetics_overlay, (0, 0))
+            if decorate is not None:
+                decorate(panel)
 
-        menu_width, menu_height = 500, 500
-        menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
+            title_surface = self.title_font.render(
+                title, True, COLORS["BLACK"]
+            )
+            panel.blit(
+                title_surface, title_surface.get_rect(center=(width // 2, 40))
+            )
+            for text, color, anchor, point in labels:
+                surface = self.font.render(text, True, color)
+                panel.blit(surface, surface.get_rect(**{anchor: point}))
 
+            panel = self.panel_cache[title] = panel.convert_alpha()
+        return panel
+
+    def draw_close_button(self, panel: pygame.Surface):
+        width, height = panel.get_size()
+        close_button = pygame.Rect((width - 200) // 2, height - 80, 200, 50)
+        pygame.draw.rect(panel, COLORS["GRAY"], close_button, border_radius=10)
         pygame.draw.rect(
-            self.screen,
-            COLORS["WHITE"],
-            (menu_x, menu_y, menu_width, menu_height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            self.screen,
-            COLORS["BLACK"],
-            (menu_x, menu_y, menu_width, menu_height),
-            3,
-            border_radius=15,
+            panel, COLORS["BLACK"], close_button, 2, border_radius=10
         )
 
-        title = self.title_font.render(
-            "Tank Customization", True, COLORS["BLACK"]
-        )
-        title_rect = title.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 40)
+    def draw_settings_divider(self, panel: pygame.Surface):
+        width, height = panel.get_size()
+        pygame.draw.line(
+            panel,
+            COLORS["GRAY"],
+            (width // 2, 100),
+            (width // 2, height - 100),
+            2,
         )
-        self.screen.blit(title, title_rect)
 
-        subtitle = self.font.render(
-            "Select Tank Color:", True, COLORS["BLACK"]
-        )
-        subtitle_rect = subtitle.get_rect(midleft=(menu_x + 50, menu_y + 90))
-        self.screen.blit(subtitle, subtitle_rect)
+    def draw_cosmetics_menu(self):
+        if not self.show_cosmetics_menu:
+            return
 
-        mouse_pos = pygame.mouse.get_pos()
-        for color_name, button in self.color_buttons.items():
-            button.update(mouse_pos)
-            button.draw(self.screen)
+        self.screen.blit(self.dim_overlay(128), (0, 0))
 
-            if color_name == self.player_color_name:
-                rect = button.rect.copy()
-                rect.inflate_ip(10, 10)
-                pygame.draw.rect(
-                    self.screen, COLORS["BLACK"], rect, 3, border_radius=10
-                )
+        menu_width, menu_height = 500, 500
+        menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
+        panel = self.menu_panel(
+            "Tank Customization",
+            menu_width,
+            menu_height,
+            [
+                ("Select Tank Color:", COLORS["BLACK"], "midleft", (50, 90)),
+                (
+                    "Preview:",
+                    COLORS["BLACK"],
+                    "topleft",
+                    (menu_width // 2 - 80, 310),
+                ),
+            ],
+        )
+        self.screen.blit(panel, (menu_x, menu_y))
+
+        if self.color_button_key != self.player_color_name:
+            self.build_color_button_surface()
+        self.screen.blit(*self.color_button_surface)
+
+        mouse_pos = self.mouse_pos
         self.cosmetics_back_button.update(mouse_pos)
         self.cosmetics_back_button.draw(self.screen)
 
         preview_x = menu_x + menu_width // 2
         preview_y = menu_y + 350
-        preview_text = self.font.render("Preview:", True, COLORS["BLACK"])
-        self.screen.blit(preview_text, (preview_x - 80, preview_y - 40))
-
         self.draw_tank((preview_x, preview_y), 0, self.player_color, False, 30)
 
+    def build_color_button_surface(self):
+        rects = [
+            button.rect.inflate(10, 10)
+            for button in self.color_buttons.values()
+        ]
+        bounds = rects[0].unionall(rects[1:])
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        offset = (-bounds.x, -bounds.y)
+
+        for color_name, button in self.color_buttons.items():
+            rect = button.rect.move(offset)
+            pygame.draw.rect(surface, button.color, rect, border_radius=10)
+            pygame.draw.rect(
+                surface, COLORS["BLACK"], rect, 2, border_radius=10
+            )
+            if color_name == self.player_color_name:
+                pygame.draw.rect(
+                    surface,
+                    COLORS["BLACK"],
+                    rect.inflate(10, 10),
+                    3,
+                    border_radius=10,
+                )
+
+        self.color_button_surface = (surface.convert_alpha(), bounds.topleft)
+        self.color_button_key = self.player_color_name
+
+    def color_button_at(self, pos: Tuple[int, int]) -> Optional[str]:
+        grid_x, grid_y, pitch, per_row, color_names = self.color_grid
+        col = (pos[0] - grid_x) // pitch
+        row = (pos[1] - grid_y) // pitch
+        if not 0 <= col < per_row or row < 0:
+            return None
+        index = row * per_row + col
+        if index >= len(color_names):
+            return None
+        color_name = color_names[index]
+        if not self.color_buttons[color_name].rect.collidepoint(pos):
+            return None
+        return color_name
+
     def reset_game(self):
+        self.dirty_rects = None
+        self.frame_debt = 0.0
         self.player_pos = [WIDTH // 2, HEIGHT // 2]
         self.player_angle = 0
         self.player_health = 100
@@ -1856,13 +3080,24 @@ class Game:
         self.score = 0
         self.kills = 0
 
-        self.bullets = []
-        self.enemy_bullets = []
-        self.enemies = [
-            spawn_enemy(self.difficulty) for _ in range(NUM_ENEMIES)
-        ]
+        difficulty_settings = DIFFICULTY_SETTINGS.get(
+            self.difficulty, DIFFICULTY_SETTINGS["normal"]
+        )
+        self.xp_multiplier = difficulty_settings["xp_multiplier"]
+        self.enemy_damage = difficulty_settings["enemy_damage"]
+
+        self.bullets = BulletStore()
+        self.enemy_bullets = BulletStore()
+        self.enemies = EnemyStore(NUM_ENEMIES, self.difficulty)
+        self.rebuild_enemy_grid()
+        for powerup in self.powerups:
+            self.release_powerup(powerup)
         self.powerups = []
+        for powerup in self.remote_powerups.values():
+            self.release_powerup(powerup)
+        self.remote_powerups = {}
         self.particles = ParticleSystem()
+        self.bind_particle_spawner()
 
         self.player_stats = {
             "max_health": 100,
@@ -1874,162 +3109,189 @@ class Game:
             "movement_speed": 4,
         }
 
-        self.active_effects = {
-            "shield": {"active": False, "end_time": 0},
-            "speed_boost": {"active": False, "end_time": 0},
-            "damage_boost": {"active": False, "end_time": 0},
-        }
+        self.shield_end_time = 0
+        self.speed_boost_end_time = 0
+        self.damage_boost_end_time = 0
+        self.live_effects = []
 
         self.reload_timer = 0
         self.respawn_time = 0
         self.is_dead = False
-        self.game_start_time = time.time()
-        self.last_powerup_time = time.time()
-        self.last_regen_time = time.time()
+        start_time = time.monotonic()
+        self.game_start_time = start_time
+        self.last_powerup_time = start_time
+        self.last_regen_time = start_time
 
         self.new_bullets = []
 
-        time.sleep(0.3)
-
     def draw_tank(
         self, pos, angle, color=COLORS["BLUE"], shield=False, size=20
-    ):
-        outline_size = size + 2
-        pygame.draw.circle(
-            self.screen,
-            COLORS["BLACK"],
-            (int(pos[0]), int(pos[1])),
-            outline_size,
-        )
-
-        pygame.draw.circle(
-            self.screen, color, (int(pos[0]), int(pos[1])), size
-        )
-
-        barrel_length = size * 1.25
-        barrel_width = int(size / 4)
-        outline_width = barrel_width + 2
-
-        barrel_x = pos[0] + barrel_length * math.cos(angle)
-        barrel_y = pos[1] + barrel_length * math.sin(angle)
-
-        pygame.draw.line(
-            self.screen,
-            COLORS["BLACK"],
-            (int(pos[0]), int(pos[1])),
-            (int(barrel_x), int(barrel_y)),
-            outline_width,
-        )
-
-        pygame.draw.line(
-            self.screen,
-            color,
-            (int(pos[0]), int(pos[1])),
-            (int(barrel_x), int(barrel_y)),
-            barrel_width,
+    ) -> pygame.Rect:
+        screen = self.screen
+        x, y = int(pos[0]), int(pos[1])
+        radius = int(size)
+        screen.blit(
+            get_tank_body(color, radius), (x - radius - 3, y - radius - 3)
         )
+        self.draw_barrel(pos, angle, color, size)
 
         if shield:
             shield_radius = size + 5
             for i in range(3):
-                pulse_offset = (time.time() * 3) % 1.0
+                pulse_offset = (self.now * 3) % 1.0
                 pulse_size = shield_radius + i * 2 + pulse_offset * 2
                 pygame.draw.circle(
-                    self.screen,
+                    screen,
                     (100, 150, 255, 100),
-                    (int(pos[0]), int(pos[1])),
+                    (x, y),
                     int(pulse_size),
                     2,
                 )
 
-    def draw_bullets(self):
-        for bullet in self.bullets:
-            pygame.draw.circle(
-                self.screen,
-                COLORS["BLUE"],
-                (int(bullet[0]), int(bullet[1])),
-                5,
-            )
+        reach = int(size * 1.5) + 10
+        return pygame.Rect(x - reach, y - reach, 2 * reach, 2 * reach)
 
-        for bullet in self.enemy_bullets:
-            pygame.draw.circle(
-                self.screen, COLORS["RED"], (int(bullet[0]), int(bullet[1])), 5
-            )
+    def draw_barrel(self, pos, angle, color, size):
+        screen = self.screen
+        x, y = int(pos[0]), int(pos[1])
+        barrel_length = size * 1.25
+        barrel_width = int(size / 4)
+        outline_width = barrel_width + 2
+
+        cos_a, sin_a = angle_vector(angle)
+        barrel_end = (
+            int(pos[0] + barrel_length * cos_a),
+            int(pos[1] + barrel_length * sin_a),
+        )
+
+        pygame.draw.line(
+            screen, COLORS["BLACK"], (x, y), barrel_end, outline_width
+        )
+        pygame.draw.line(screen, color, (x, y), barrel_end, barrel_width)
+
+    def draw_bullets(self):
+        blue = get_bullet_sprite(COLORS["BLUE"])
+        red = get_bullet_sprite(COLORS["RED"])
+
+        bullets, enemy_bullets = self.bullets, self.enemy_bullets
+        blits = [
+            (blue, offset)
+            for offset in (
+                bullets.pos[: len(bullets)].astype(np.int32) - 5
+            ).tolist()
+        ]
+        blits += [
+            (red, offset)
+            for offset in (
+                enemy_bullets.pos[: len(enemy_bullets)].astype(np.int32) - 5
+            ).tolist()
+        ]
 
         if self.multiplayer_mode and "bullets" in self.client.game_state:
-            for bullet in self.client.game_state["bullets"]:
-                if (
-                    "owner" in bullet
-                    and bullet["owner"] == self.client.player_id
-                ):
-                    continue
-
-                color = (
-                    COLORS["YELLOW"]
-                    if bullet["owner"] != "enemy"
-                    else COLORS["RED"]
-                )
-                pygame.draw.circle(
-                    self.screen,
-                    color,
-                    (int(bullet["pos"][0]), int(bullet["pos"][1])),
-                    5,
+            yellow = get_bullet_sprite(COLORS["YELLOW"])
+            remote = self.client.game_state["bullets"]
+            remote = remote[remote["owner"] != self.client.owner_id]
+            blits += [
+                (red if owner < 0 else yellow, (x - 5, y - 5))
+                for x, y, owner in zip(
+                    remote["x"].astype(np.int32).tolist(),
+                    remote["y"].astype(np.int32).tolist(),
+                    remote["owner"].tolist(),
                 )
+            ]
+
+        if blits:
+            blit_batch(self.screen, blits, self.dirty_rects)
 
     def draw_enemies(self):
-        enemy_list = (
-            self.client.game_state["enemies"]
-            if self.multiplayer_mode
-            else self.enemies
-        )
-
-        for enemy in enemy_list:
-            enemy_type = enemy.get("type", "normal")
-            if enemy_type == "normal":
-                color = COLORS["RED"]
-            elif enemy_type == "fast":
-                color = COLORS["ORANGE"]
-            elif enemy_type == "tank":
-                color = COLORS["MAGENTA"]
-            else:
-                color = COLORS["RED"]
-
-            size = enemy.get("size", 20)
-            self.draw_tank(
-                (enemy["pos"][0], enemy["pos"][1]),
-                enemy.get("angle", 0),
-                color,
-                False,
-                size,
+        if self.multiplayer_mode:
+            records = self.client.game_state["enemies"]
+            if not len(records):
+                return
+
+            pos = np.column_stack((records["x"], records["y"])).astype(
+                np.float64
             )
+            size = records["size"].astype(np.float64)
+            health_pct = (
+                records["health"].astype(np.float64) / records["max_health"]
+            )
+            angles = records["angle"].tolist()
+            types = [ENEMY_TYPES[index] for index in records["type"].tolist()]
+        else:
+            enemies = self.enemies
+            if not len(enemies):
+                return
 
-            max_health = enemy.get("max_health", 30)
-            health_pct = enemy["health"] / max_health
-            health_width = int(size * 2 * health_pct)
+            pos = enemies.pos.astype(np.float64)
+            size = enemies.size.astype(np.float64)
+            health_pct = enemies.health / enemies.max_health
+            angles = enemies.angle.tolist()
+            types = [ENEMY_TYPES[index] for index in enemies.type.tolist()]
+
+        centers = pos.astype(np.int64)
+        radii = size.astype(np.int64)
+        body_offsets = centers - radii[:, None] - 3
+        reach = (size * 1.5).astype(np.int64) + 10
+        bar_offsets = (pos - size[:, None]).astype(np.int64)
+        bar_offsets[:, 1] -= 10
+        bar_width = (size * 2).astype(np.int64)
+        health_width = np.maximum((size * 2 * health_pct).astype(np.int64), 0)
+
+        palette = self.enemy_palette
+        default_color = COLORS["RED"]
+        dark_gray, green = COLORS["DARK_GRAY"], COLORS["GREEN"]
+        colors = [
+            palette.get(enemy_type, default_color) for enemy_type in types
+        ]
+        radii = radii.tolist()
+        bar_width = bar_width.tolist()
+        bar_offsets = bar_offsets.tolist()
+
+        screen = self.screen
+        screen.blits(
+            [
+                (get_tank_body(color, radius), offset)
+                for color, radius, offset in zip(
+                    colors, radii, body_offsets.tolist()
+                )
+            ],
+            doreturn=False,
+        )
 
-            health_bar_y = enemy["pos"][1] - size - 10
-            pygame.draw.rect(
-                self.screen,
-                COLORS["DARK_GRAY"],
-                (enemy["pos"][0] - size, health_bar_y, size * 2, 5),
-            )
-            pygame.draw.rect(
-                self.screen,
-                COLORS["GREEN"],
-                (enemy["pos"][0] - size, health_bar_y, health_width, 5),
+        draw_barrel = self.draw_barrel
+        for center, angle, color, radius in zip(
+            pos.tolist(), angles, colors, size.tolist()
+        ):
+            draw_barrel(center, angle, color, radius)
+
+        bars = []
+        for offset, width, filled in zip(
+            bar_offsets, bar_width, health_width.tolist()
+        ):
+            bars.append((get_health_bar(dark_gray, width), offset))
+            bars.append(
+                (get_health_bar(green, width), offset, (0, 0, filled, 5))
             )
+        screen.blits(bars, doreturn=False)
+
+        self.dirty_rects += [
+            pygame.Rect(x - r, y - r, 2 * r, 2 * r)
+            for (x, y), r in zip(centers.tolist(), reach.tolist())
+        ]
 
     def draw_players(self):
         if not self.is_dead:
-            has_shield = self.player_shield > 0 or (
-                self.active_effects["shield"]["active"]
-                and time.time() < self.active_effects["shield"]["end_time"]
+            has_shield = (
+                self.player_shield > 0 or self.now < self.shield_end_time
             )
-            self.draw_tank(
-                self.player_pos,
-                self.player_angle,
-                self.player_color,
-                has_shield,
+            self.dirty_rects.append(
+                self.draw_tank(
+                    self.player_pos,
+                    self.player_angle,
+                    self.player_color,
+                    has_shield,
+                )
             )
 
         if self.multiplayer_mode:
@@ -2042,178 +3304,188 @@ class Game:
                     has_shield = (
                         "shield" in player_data and player_data["shield"] > 0
                     )
-                    self.draw_tank(
-                        player_data["pos"],
-                        player_data["angle"],
-                        color,
-                        has_shield,
+                    self.dirty_rects.append(
+                        self.draw_tank(
+                            player_data["pos"],
+                            player_data["angle"],
+                            color,
+                            has_shield,
+                        )
                     )
 
-                    name_text = self.font.render(
+                    name_text = self.render_text(
                         f"Player {player_id} [Lv.{player_data.get('level', 1)}]",
-                        True,
                         COLORS["BLACK"],
                     )
-                    self.screen.blit(
-                        name_text,
-                        (
-                            player_data["pos"][0] - 50,
-                            player_data["pos"][1] - 40,
-                        ),
+                    self.dirty_rects.append(
+                        self.screen.blit(
+                            name_text,
+                            (
+                                player_data["pos"][0] - 50,
+                                player_data["pos"][1] - 40,
+                            ),
+                        )
                     )
 
                     color_idx += 1
 
     def draw_powerups(self):
         if self.multiplayer_mode and "powerups" in self.client.game_state:
+            remote = self.remote_powerups
+            seen = {}
             for powerup_data in self.client.game_state["powerups"]:
                 pos = powerup_data.get("pos", [0, 0])
                 powerup_type = powerup_data.get("type", "xp")
+                key = (
+                    powerup_type,
+                    pos[0],
+                    pos[1],
+                    powerup_data.get("creation_time"),
+                )
 
-                powerup = PowerUp((pos[0], pos[1]), powerup_type)
+                powerup = remote.get(key)
+                if powerup is None:
+                    powerup = self.acquire_powerup(
+                        (pos[0], pos[1]), powerup_type
+                    )
+                seen[key] = powerup
                 powerup.update()
-                powerup.draw(self.screen)
+                self.dirty_rects.append(powerup.draw(self.screen))
+
+            for key, powerup in remote.items():
+                if key not in seen:
+                    self.release_powerup(powerup)
+            self.remote_powerups = seen
         else:
             for powerup in self.powerups:
                 powerup.update()
-                powerup.draw(self.screen)
+                self.dirty_rects.append(powerup.draw(self.screen))
 
     def draw_particles(self):
         if self.particle_effects:
-            self.particles.draw(self.screen)
+            self.particles.draw(self.screen, self.dirty_rects)
 
     def draw_ui(self):
-        health_text = self.font.render(
-            f"Health: {int(self.player_health)}/{self.player_stats['max_health']}",
-            True,
+        red, blue, black, green = (
             COLORS["RED"],
+            COLORS["BLUE"],
+            COLORS["BLACK"],
+            COLORS["GREEN"],
         )
-        shield_text = self.font.render(
-            f"Shield: {int(self.player_shield)}", True, COLORS["BLUE"]
+        screen = self.screen
+        text = self.text_part_blits
+        seconds_played = int(self.now - self.game_start_time)
+        minutes = seconds_played // 60
+        seconds = seconds_played % 60
+
+        hud = self.hud_surfaces
+        if hud is None:
+            hud = self.hud_surfaces = self.build_hud_surfaces()
+
+        xp_width = int((self.player_xp / self.xp_to_next_level) * 200)
+        health_width = int(
+            (self.player_health / self.player_stats["max_health"]) * 200
+        )
+        blits = [(hud["panel"], (0, 0))]
+        blits += text(
+            f"Health: {int(self.player_health)}/{self.player_stats['max_health']}",
+            red,
+            (10, 10),
+            "topleft",
         )
-        xp_text = self.font.render(
+        blits += text(
+            f"Shield: {int(self.player_shield)}", blue, (10, 35), "topleft"
+        )
+        blits += text(
             f"XP: {self.player_xp}/{self.xp_to_next_level}",
-            True,
-            COLORS["BLUE"],
+            blue,
+            (10, 60),
+            "topleft",
         )
-        level_text = self.font.render(
-            f"Level: {self.player_level}", True, COLORS["BLACK"]
+        blits += text(
+            f"Level: {self.player_level}", black, (10, 85), "topleft"
         )
-        points_text = self.font.render(
+        blits += text(
             f"Upgrade Points: {self.player_upgrade_points}",
-            True,
-            COLORS["GREEN"],
-        )
-        score_text = self.font.render(
-            f"Score: {self.score}", True, COLORS["PURPLE"]
+            green,
+            (10, 110),
+            "topleft",
         )
-        kills_text = self.font.render(
-            f"Kills: {self.kills}", True, COLORS["RED"]
+        blits += text(
+            f"Score: {self.score}", COLORS["PURPLE"], (10, 135), "topleft"
         )
-
-        seconds_played = int(time.time() - self.game_start_time)
-        minutes = seconds_played // 60
-        seconds = seconds_played % 60
-        time_text = self.font.render(
-            f"Time: {minutes:02d}:{seconds:02d}", True, COLORS["BLACK"]
+        blits += text(f"Kills: {self.kills}", red, (10, 160), "topleft")
+        blits += text(
+            f"Time: {minutes:02d}:{seconds:02d}",
+            black,
+            (WIDTH - 120, 10),
+            "topleft",
         )
 
-        panel_height = 180
-        pygame.draw.rect(
-            self.screen, (240, 240, 240, 200), (0, 0, 220, panel_height)
-        )
-        pygame.draw.rect(
-            self.screen, COLORS["DARK_GRAY"], (0, 0, 220, panel_height), 2
-        )
-
-        self.screen.blit(health_text, (10, 10))
-        self.screen.blit(shield_text, (10, 35))
-        self.screen.blit(xp_text, (10, 60))
-        self.screen.blit(level_text, (10, 85))
-        self.screen.blit(points_text, (10, 110))
-        self.screen.blit(score_text, (10, 135))
-        self.screen.blit(kills_text, (10, 160))
-        self.screen.blit(time_text, (WIDTH - 120, 10))
-
-        effect_y = 200
-        for effect_name, effect_data in self.active_effects.items():
-            if effect_data["active"] and time.time() < effect_data["end_time"]:
-                remaining = int(effect_data["end_time"] - time.time())
-                effect_text = self.font.render(
-                    f"{effect_name.replace('_', ' ').title()}: {remaining}s",
-                    True,
-                    COLORS["BLUE"],
+        if self.live_effects:
+            now = self.now
+            self.live_effects = [
+                live for live in self.live_effects if live[1] > now
+            ]
+            effect_y = 200
+            for effect_name, end_time in self.live_effects:
+                blits += text(
+                    f"{EFFECT_LABELS[effect_name]}: {int(end_time - now)}s",
+                    blue,
+                    (10, effect_y),
+                    "topleft",
                 )
-                self.screen.blit(effect_text, (10, effect_y))
                 effect_y += 25
 
-        pygame.draw.rect(self.screen, COLORS["DARK_GRAY"], (230, 10, 200, 15))
-        xp_width = int((self.player_xp / self.xp_to_next_level) * 200)
-        pygame.draw.rect(self.screen, COLORS["BLUE"], (230, 10, xp_width, 15))
-
-        pygame.draw.rect(self.screen, COLORS["DARK_GRAY"], (230, 35, 200, 15))
-        health_width = int(
-            (self.player_health / self.player_stats["max_health"]) * 200
-        )
-        pygame.draw.rect(
-            self.screen, COLORS["RED"], (230, 35, health_width, 15)
-        )
+        blits += [
+            (hud["bar"], (230, 10)),
+            (hud["xp"], (230, 10), (0, 0, max(0, xp_width), 15)),
+            (hud["bar"], (230, 35)),
+            (hud["health"], (230, 35), (0, 0, max(0, health_width), 15)),
+        ]
 
         if self.player_shield > 0:
-            pygame.draw.rect(
-                self.screen, COLORS["DARK_GRAY"], (230, 60, 200, 10)
-            )
             shield_width = int((self.player_shield / 30) * 200)
-            pygame.draw.rect(
-                self.screen, (100, 150, 255), (230, 60, shield_width, 10)
-            )
+            blits += [
+                (hud["shield_bar"], (230, 60)),
+                (hud["shield"], (230, 60), (0, 0, shield_width, 10)),
+            ]
 
         if self.multiplayer_mode:
-            players_text = self.font.render(
+            blits += text(
                 f"Players: {len(self.client.game_state['players'])}",
-                True,
-                COLORS["BLACK"],
+                black,
+                (WIDTH - 120, 35),
+                "topleft",
             )
-            ping_text = self.font.render(
-                f"Ping: {self.client.ping} ms", True, COLORS["BLACK"]
+            blits += text(
+                f"Ping: {self.client.ping} ms",
+                black,
+                (WIDTH - 120, 60),
+                "topleft",
             )
-            self.screen.blit(players_text, (WIDTH - 120, 35))
-            self.screen.blit(ping_text, (WIDTH - 120, 60))
 
         if self.fps_display:
-            current_time = time.time()
-            elapsed = current_time - self.last_update_time
-
-            self.frame_times.append(self.clock.get_time())
-
-            if len(self.frame_times) > 60:
-                self.frame_times.pop(0)
-
-            if elapsed >= self.update_interval:
-                self.last_update_time = current_time
-
-            avg_frame_time = (
-                sum(self.frame_times) / len(self.frame_times)
-                if self.frame_times
-                else 0
-            )
-            fps = 0 if avg_frame_time == 0 else 1000 / avg_frame_time
-
-            fps_text = self.font.render(
+            fps = self.clock.get_fps()
+            blits += text(
                 f"FPS: {int(fps)}",
-                True,
                 (
-                    COLORS["GREEN"]
+                    green
                     if fps >= 55
-                    else COLORS["YELLOW"] if fps >= 30 else COLORS["RED"]
+                    else COLORS["YELLOW"] if fps >= 30 else red
                 ),
+                (WIDTH - 100, HEIGHT - 30),
+                "topleft",
             )
-            self.screen.blit(fps_text, (WIDTH - 100, HEIGHT - 30))
 
-        mouse_pos = pygame.mouse.get_pos()
+        dirty = self.dirty_rects
+        dirty += screen.blits(blits)
+
+        mouse_pos = self.mouse_pos
         for button in self.game_buttons.values():
             button.update(mouse_pos)
-            button.draw(self.screen)
+            button.draw(screen)
+            dirty.append(button.rect)
 
     def draw_upgrade_menu(self):
         if not self.show_upgrade_menu:
@@ -2222,34 +3494,34 @@ class Game:
         menu_width, menu_height = 500, 600
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.dim_overlay(128), (0, 0))
 
-        pygame.draw.rect(
-            self.screen,
-            COLORS["WHITE"],
-            (menu_x, menu_y, menu_width, menu_height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            self.screen,
-            COLORS["BLACK"],
-            (menu_x, menu_y, menu_width, menu_height),
-            3,
-            border_radius=15,
-        )
-
-        title = self.title_font.render("Upgrade Stats", True, COLORS["BLACK"])
-        title_rect = title.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 40)
+        self.screen.blit(
+            self.menu_panel(
+                "Upgrade Stats",
+                menu_width,
+                menu_height,
+                [
+                    (name, COLORS["BLACK"], "topleft", (30, 130 + i * 60))
+                    for i, (name, _, _) in enumerate(UPGRADE_STATS)
+                ]
+                + [
+                    (
+                        "Close [U]",
+                        COLORS["BLACK"],
+                        "center",
+                        (menu_width // 2, menu_height - 55),
+                    )
+                ],
+                self.draw_close_button,
+            ),
+            (menu_x, menu_y),
         )
-        self.screen.blit(title, title_rect)
 
-        points_text = self.subtitle_font.render(
+        points_text = self.render_text(
             f"Upgrade Points: {self.player_upgrade_points}",
-            True,
             COLORS["GREEN"],
+            self.subtitle_font,
         )
         points_rect = points_text.get_rect(
             center=(menu_x + menu_width // 2, menu_y + 80)
@@ -2259,30 +3531,11 @@ class Game:
         y_offset = 130
         button_width, button_height = 40, 40
 
-        stats_info = [
-            ("Health Max", "max_health", 10),
-            ("Health Regen", "regen", 0.5),
-            ("Bullet Damage", "bullet_damage", 2),
-            ("Bullet Speed", "bullet_speed", 0.5),
-            ("Bullet Penetration", "bullet_penetration", 1),
-            ("Reload Speed", "bullet_reload", -1),
-            ("Movement Speed", "movement_speed", 0.2),
-        ]
-
-        for name, stat_key, increment in stats_info:
-            stat_text = self.font.render(name, True, COLORS["BLACK"])
-            self.screen.blit(stat_text, (menu_x + 30, menu_y + y_offset))
-
+        for name, stat_key, increment in UPGRADE_STATS:
             stat_level = self.get_stat_level(stat_key)
-            for i in range(MAX_STAT_LEVEL):
-                rect = pygame.Rect(
-                    menu_x + 220 + i * 20, menu_y + y_offset, 15, 20
-                )
-                color = COLORS["BLUE"] if i < stat_level else COLORS["GRAY"]
-                pygame.draw.rect(self.screen, color, rect, border_radius=3)
-                pygame.draw.rect(
-                    self.screen, COLORS["BLACK"], rect, 1, border_radius=3
-                )
+            self.screen.blit(
+                self.stat_bar(stat_level), (menu_x + 220, menu_y + y_offset)
+            )
 
             upgrade_button = pygame.Rect(
                 menu_x + menu_width - 90,
@@ -2307,88 +3560,45 @@ class Game:
                 border_radius=5,
             )
 
-            plus_text = self.font.render("+", True, COLORS["BLACK"])
+            plus_text = self.render_text("+", COLORS["BLACK"])
             plus_rect = plus_text.get_rect(center=upgrade_button.center)
             self.screen.blit(plus_text, plus_rect)
 
-            value_text = self.font.render(
-                f"{self.player_stats[stat_key]}", True, COLORS["BLACK"]
+            value_text = self.render_text(
+                f"{self.player_stats[stat_key]}", COLORS["BLACK"]
             )
             self.screen.blit(value_text, (menu_x + 390, menu_y + y_offset))
 
             y_offset += 60
 
-        close_button = pygame.Rect(
-            menu_x + (menu_width - 200) // 2,
-            menu_y + menu_height - 80,
-            200,
-            50,
-        )
-        pygame.draw.rect(
-            self.screen, COLORS["GRAY"], close_button, border_radius=10
-        )
-        pygame.draw.rect(
-            self.screen, COLORS["BLACK"], close_button, 2, border_radius=10
-        )
-
-        close_text = self.font.render("Close [U]", True, COLORS["BLACK"])
-        close_rect = close_text.get_rect(center=close_button.center)
-        self.screen.blit(close_text, close_rect)
-
     def draw_settings_menu(self):
         if not self.show_settings_menu:
             return
 
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.dim_overlay(128), (0, 0))
 
         menu_width, menu_height = 500, 600
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
-        pygame.draw.rect(
-            self.screen,
-            COLORS["WHITE"],
-            (menu_x, menu_y, menu_width, menu_height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            self.screen,
-            COLORS["BLACK"],
-            (menu_x, menu_y, menu_width, menu_height),
-            3,
-            border_radius=15,
-        )
-
-        title = self.title_font.render("Settings", True, COLORS["BLACK"])
-        title_rect = title.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 40)
-        )
-        self.screen.blit(title, title_rect)
-
-        sliders_header = self.font.render("Controls", True, COLORS["BLACK"])
-        buttons_header = self.font.render("Options", True, COLORS["BLACK"])
-
-        sliders_header_rect = sliders_header.get_rect(
-            center=(menu_x + menu_width // 4, menu_y + 80)
-        )
-        buttons_header_rect = buttons_header.get_rect(
-            center=(menu_x + menu_width * 3 // 4, menu_y + 80)
-        )
-
-        self.screen.blit(sliders_header, sliders_header_rect)
-        self.screen.blit(buttons_header, buttons_header_rect)
-
-        pygame.draw.line(
-            self.screen,
-            COLORS["GRAY"],
-            (menu_x + menu_width // 2, menu_y + 100),
-            (menu_x + menu_width // 2, menu_y + menu_height - 100),
-            2,
+        panel = self.menu_panel(
+            "Settings",
+            menu_width,
+            menu_height,
+            [
+                ("Controls", COLORS["BLACK"], "center", (menu_width // 4, 80)),
+                (
+                    "Options",
+                    COLORS["BLACK"],
+                    "center",
+                    (menu_width * 3 // 4, 80),
+                ),
+            ],
+            self.draw_settings_divider,
         )
+        self.screen.blit(panel, (menu_x, menu_y))
 
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()
+        mouse_pos = self.mouse_pos
+        mouse_pressed = self.mouse_buttons
 
         for slider in self.settings_sliders.values():
             slider.value = slider.update(mouse_pos, mouse_pressed)
@@ -2403,54 +3613,40 @@ class Game:
         self.settings_buttons["fps"].text = (
             f"FPS Display: {'ON' if self.fps_display else 'OFF'}"
         )
+        self.settings_buttons["dim"].text = (
+            f"Fast Dim: {'ON' if self.cheap_dim else 'OFF'}"
+        )
 
         for button in self.settings_buttons.values():
             button.update(mouse_pos)
             button.draw(self.screen)
 
     def draw_host_menu(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        if self.current_screen != "host":
+            return
+
+        self.screen.blit(self.dim_overlay(128), (0, 0))
 
         menu_width, menu_height = 500, 300
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
-        pygame.draw.rect(
-            self.screen,
-            COLORS["WHITE"],
-            (menu_x, menu_y, menu_width, menu_height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            self.screen,
-            COLORS["BLACK"],
-            (menu_x, menu_y, menu_width, menu_height),
-            3,
-            border_radius=15,
-        )
-
-        title = self.title_font.render("Host Game", True, COLORS["BLACK"])
-        title_rect = title.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 40)
+        panel = self.menu_panel(
+            "Host Game",
+            menu_width,
+            menu_height,
+            [("Difficulty:", COLORS["BLACK"], "topleft", (50, 150))],
         )
-        self.screen.blit(title, title_rect)
+        self.screen.blit(panel, (menu_x, menu_y))
 
-        info_text = self.font.render(
-            f"Server will start on localhost:{self.host_port}",
-            True,
-            COLORS["BLACK"],
+        info_text = self.render_text(
+            f"Server will start on localhost:{self.host_port}", COLORS["BLACK"]
         )
         info_rect = info_text.get_rect(
             center=(menu_x + menu_width // 2, menu_y + 100)
         )
         self.screen.blit(info_text, info_rect)
 
-        mouse_pos = pygame.mouse.get_pos()
-
-        diff_text = self.font.render("Difficulty:", True, COLORS["BLACK"])
-        diff_rect = diff_text.get_rect(topleft=(menu_x + 50, menu_y + 150))
-        self.screen.blit(diff_text, diff_rect)
+        mouse_pos = self.mouse_pos
 
         for name, button in self.difficulty_buttons.items():
             color_boost = 50 if name == self.difficulty else 0
@@ -2473,52 +3669,38 @@ class Game:
             button.draw(self.screen)
 
     def draw_join_menu(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        if self.current_screen != "join":
+            return
+
+        self.screen.blit(self.dim_overlay(128), (0, 0))
 
         menu_width, menu_height = 500, 300
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
 
-        pygame.draw.rect(
-            self.screen,
-            COLORS["WHITE"],
-            (menu_x, menu_y, menu_width, menu_height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            self.screen,
-            COLORS["BLACK"],
-            (menu_x, menu_y, menu_width, menu_height),
-            3,
-            border_radius=15,
-        )
-
-        title = self.title_font.render("Join Game", True, COLORS["BLACK"])
-        title_rect = title.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 40)
+        panel = self.menu_panel(
+            "Join Game",
+            menu_width,
+            menu_height,
+            [
+                (
+                    "(Edit server.py to change IP/port)",
+                    COLORS["DARK_GRAY"],
+                    "center",
+                    (menu_width // 2, 130),
+                )
+            ],
         )
-        self.screen.blit(title, title_rect)
+        self.screen.blit(panel, (menu_x, menu_y))
 
-        info_text = self.font.render(
-            f"Connect to: {self.join_ip}:{self.join_port}",
-            True,
-            COLORS["BLACK"],
+        info_text = self.render_text(
+            f"Connect to: {self.join_ip}:{self.join_port}", COLORS["BLACK"]
         )
         info_rect = info_text.get_rect(
             center=(menu_x + menu_width // 2, menu_y + 100)
         )
         self.screen.blit(info_text, info_rect)
 
-        note_text = self.font.render(
-            "(Edit server.py to change IP/port)", True, COLORS["DARK_GRAY"]
-        )
-        note_rect = note_text.get_rect(
-            center=(menu_x + menu_width // 2, menu_y + 130)
-        )
-        self.screen.blit(note_text, note_rect)
-
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos
         for button in self.join_buttons.values():
             button.update(mouse_pos)
             button.draw(self.screen)
@@ -2526,25 +3708,16 @@ class Game:
     def draw_main_menu(self):
         self.screen.fill(COLORS["WHITE"])
 
-        current_time = time.time()
-        for i in range(20):
-            x = (WIDTH // 2) + math.cos(current_time * 0.5 + i * 0.5) * (
-                WIDTH // 3
-            )
-            y = (HEIGHT // 2) + math.sin(current_time * 0.5 + i * 0.7) * (
-                HEIGHT // 3
-            )
-            size = 20 + 10 * math.sin(current_time + i)
-            alpha = int(128 + 64 * math.sin(current_time * 0.3 + i * 0.2))
-
-            circle_surf = pygame.Surface(
-                (int(size * 2), int(size * 2)), pygame.SRCALPHA
-            )
-            color = (*PLAYER_COLORS[i % len(PLAYER_COLORS)][:3], alpha)
-            pygame.draw.circle(
-                circle_surf, color, (int(size), int(size)), int(size)
+        xs, ys, sizes, alphas = menu_bubbles(self.now, WIDTH, HEIGHT)
+        screen = self.screen
+        for i, (x, y, size, alpha) in enumerate(
+            zip(xs.tolist(), ys.tolist(), sizes.tolist(), alphas.tolist())
+        ):
+            sprite = get_bubble_sprite(
+                PLAYER_COLORS[i % len(PLAYER_COLORS)], int(size)
             )
-            self.screen.blit(circle_surf, (int(x - size), int(y - size)))
+            sprite.set_alpha(alpha)
+            screen.blit(sprite, (int(x - size), int(y - size)))
 
         menu_width = 450
         menu_height = 600
@@ -2565,10 +3738,10 @@ class Game:
             border_radius=20,
         )
 
-        title = self.title_font.render("BULLETVERSE.IO", True, COLORS["BLUE"])
-        subtitle = self.font.render(
-            "Multiplayer Tank Battle", True, COLORS["BLACK"]
+        title = self.render_text(
+            "BULLETVERSE.IO", COLORS["BLUE"], self.title_font
         )
+        subtitle = self.render_text("Multiplayer Tank Battle", COLORS["BLACK"])
 
         title_rect = title.get_rect(
             center=(menu_x + menu_width // 2, menu_y + 60)
@@ -2580,72 +3753,55 @@ class Game:
         self.screen.blit(title, title_rect)
         self.screen.blit(subtitle, subtitle_rect)
 
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos
         for button in self.menu_buttons.values():
             button.update(mouse_pos)
             button.draw(self.screen)
 
-        version_text = self.font.render(
-            "Version 2.0", True, COLORS["DARK_GRAY"]
-        )
+        version_text = self.render_text("Version 2.0", COLORS["DARK_GRAY"])
         self.screen.blit(version_text, (WIDTH - 120, HEIGHT - 30))
 
-        if self.show_cosmetics_menu:
-            self.draw_cosmetics_menu()
+        self.draw_cosmetics_menu()
 
     def draw_death_screen(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        if self.cheap_dim:
+            self.screen.fill(
+                DEATH_DIM_COLOR, special_flags=pygame.BLEND_RGB_MULT
+            )
+        else:
+            self.screen.blit(self.dim_overlay(180), (0, 0))
 
-        death_text = self.title_font.render("You Died!", True, COLORS["RED"])
+        death_text = self.render_text(
+            "You Died!", COLORS["RED"], self.title_font
+        )
         death_rect = death_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
-        self.screen.blit(death_text, death_rect)
+        blits = [(death_text, death_rect)]
 
-        remaining = max(0, int(self.respawn_time - time.time()))
-        respawn_text = self.subtitle_font.render(
-            f"Respawning in {remaining}...", True, COLORS["WHITE"]
+        remaining = max(0, int(self.respawn_time - self.now))
+        blits += self.text_part_blits(
+            f"Respawning in {remaining}...",
+            COLORS["WHITE"],
+            (WIDTH // 2, HEIGHT // 2),
+            font=self.subtitle_font,
         )
-        respawn_rect = respawn_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        self.screen.blit(respawn_text, respawn_rect)
 
-        stats_text = self.font.render(
-            f"Score: {self.score}   Kills: {self.kills}   Level: {self.player_level}",
-            True,
+        blits += self.text_part_blits(
+            f"Score: {self.score}   Kills: {self.kills}"
+            f"   Level: {self.player_level}",
             COLORS["WHITE"],
+            (WIDTH // 2, HEIGHT // 2 + 50),
         )
-        stats_rect = stats_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
-        self.screen.blit(stats_text, stats_rect)
+        self.screen.blits(blits, doreturn=False)
 
     def get_stat_level(self, stat_key):
-        base_values = {
-            "max_health": 100,
-            "regen": 0,
-            "bullet_damage": 10,
-            "bullet_speed": BULLET_SPEED,
-            "bullet_penetration": 1,
-            "bullet_reload": 10,
-            "movement_speed": 4,
-        }
-
-        increments = {
-            "max_health": 10,
-            "regen": 0.5,
-            "bullet_damage": 2,
-            "bullet_speed": 0.5,
-            "bullet_penetration": 1,
-            "bullet_reload": -1,
-            "movement_speed": 0.2,
-        }
-
         current = self.player_stats[stat_key]
-        base = base_values[stat_key]
-        increment = increments[stat_key]
+        base = STAT_BASE[stat_key]
+        increment = STAT_INCREMENT[stat_key]
 
         if increment > 0:
             return int((current - base) / increment)
         else:
-            return int((base - current) / abs(increment))
+            return int((base - current) / -increment)
 
     def handle_upgrade_click(self, pos):
         if not self.show_upgrade_menu or self.player_upgrade_points <= 0:
@@ -2655,29 +3811,17 @@ class Game:
         menu_x, menu_y = (WIDTH - menu_width) // 2, (HEIGHT - menu_height) // 2
         button_width, button_height = 40, 40
 
-        stats_info = [
-            ("Health Max", "max_health", 10),
-            ("Health Regen", "regen", 0.5),
-            ("Bullet Damage", "bullet_damage", 2),
-            ("Bullet Speed", "bullet_speed", 0.5),
-            ("Bullet Penetration", "bullet_penetration", 1),
-            ("Reload Speed", "bullet_reload", -1),
-            ("Movement Speed", "movement_speed", 0.2),
-        ]
-
         y_offset = 130
-        for _, stat_key, increment in stats_info:
+        for _, stat_key, increment in UPGRADE_STATS:
             upgrade_button = pygame.Rect(
                 menu_x + menu_width - 90,
                 menu_y + y_offset - 5,
                 button_width,
                 button_height,
             )
-            stat_level = self.get_stat_level(stat_key)
-
             if (
                 upgrade_button.collidepoint(pos)
-                and stat_level < MAX_STAT_LEVEL
+                and self.get_stat_level(stat_key) < MAX_STAT_LEVEL
             ):
                 self.player_stats[stat_key] += increment
                 self.player_upgrade_points -= 1
@@ -2707,6 +3851,7 @@ class Game:
 
             elif self.settings_buttons["particles"].is_clicked(event):
                 self.particle_effects = not self.particle_effects
+                self.bind_particle_spawner()
                 self.play_sound("button")
                 return True
 
@@ -2720,6 +3865,11 @@ class Game:
                 self.play_sound("button")
                 return True
 
+            elif self.settings_buttons["dim"].is_clicked(event):
+                self.cheap_dim = not self.cheap_dim
+                self.play_sound("button")
+                return True
+
             elif self.settings_buttons["back"].is_clicked(event):
                 self.show_settings_menu = False
                 self.save_settings()
@@ -2744,6 +3894,9 @@ class Game:
             WIDTH, HEIGHT = 1280, 720
             self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
 
+        self.text_cache.clear()
+        self.dirty_rects = None
+        self.menu_state = None
         self.initialize_menus()
 
     def update_settings(self):
@@ -2810,7 +3963,7 @@ class Game:
                 return True
 
         if self.show_settings_menu:
-            return self.handle_settings_click(pygame.mouse.get_pos(), event)
+            return self.handle_settings_click(self.mouse_pos, event)
 
         if self.current_screen == "host":
             for name, button in self.difficulty_buttons.items():
@@ -2844,12 +3997,12 @@ class Game:
 
         if self.show_cosmetics_menu:
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                for color_name, button in self.color_buttons.items():
-                    if button.is_clicked(event):
-                        self.player_color_name = color_name
-                        self.player_color = self.available_colors[color_name]
-                        self.play_sound("button")
-                        return True
+                color_name = self.color_button_at(event.pos)
+                if color_name is not None:
+                    self.player_color_name = color_name
+                    self.player_color = self.available_colors[color_name]
+                    self.play_sound("button")
+                    return True
 
                 if self.cosmetics_back_button.is_clicked(event):
                     self.show_cosmetics_menu = False
@@ -2900,7 +4053,7 @@ class Game:
                 self.toggle_music()
 
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.mouse_pos
 
             if self.game_buttons["upgrade"].rect.collidepoint(mouse_pos):
                 self.show_upgrade_menu = not self.show_upgrade_menu
@@ -2923,41 +4076,41 @@ class Game:
             if self.show_upgrade_menu:
                 self.handle_upgrade_click(mouse_pos)
             elif not self.is_dead and self.reload_timer <= 0:
-                angle = math.atan2(
-                    mouse_pos[1] - self.player_pos[1],
-                    mouse_pos[0] - self.player_pos[0],
+                dx = mouse_pos[0] - self.player_pos[0]
+                dy = mouse_pos[1] - self.player_pos[1]
+                angle = math.atan2(dy, dx)
+                distance = math.hypot(dx, dy)
+                direction = (
+                    (dx / distance, dy / distance) if distance else (1.0, 0.0)
                 )
 
                 damage = self.player_stats["bullet_damage"]
-                if (
-                    self.active_effects["damage_boost"]["active"]
-                    and time.time()
-                    < self.active_effects["damage_boost"]["end_time"]
-                ):
+                if self.now < self.damage_boost_end_time:
                     damage += 5
 
-                bullet = [
-                    self.player_pos[0] + 25 * math.cos(angle),
-                    self.player_pos[1] + 25 * math.sin(angle),
+                bullet_pos = (
+                    self.player_pos[0] + 25 * direction[0],
+                    self.player_pos[1] + 25 * direction[1],
+                )
+                penetration = self.player_stats["bullet_penetration"]
+                self.bullets.append(
+                    bullet_pos,
                     angle,
-                    self.player_stats["bullet_penetration"],
+                    self.player_stats["bullet_speed"],
+                    penetration,
                     damage,
-                ]
-                self.bullets.append(bullet)
+                    0,
+                    direction,
+                )
 
                 self.play_sound("shoot")
 
-                if self.particle_effects:
-                    bullet_pos = (
-                        self.player_pos[0] + 25 * math.cos(angle),
-                        self.player_pos[1] + 25 * math.sin(angle),
-                    )
-                    self.particles.add_particles(
-                        bullet_pos, COLORS["BLUE"], 5, 1.0, 20
-                    )
+                self.spawn_particles(bullet_pos, COLORS["BLUE"], 5, 1.0, 20)
 
                 if self.multiplayer_mode:
-                    self.new_bullets.append(bullet)
+                    self.new_bullets.append(
+                        (*bullet_pos, angle, penetration, damage)
+                    )
 
                 self.reload_timer = self.player_stats["bullet_reload"]
 
@@ -2965,13 +4118,10 @@ class Game:
         if self.is_dead:
             return
 
-        keys = pygame.key.get_pressed()
+        keys = self.keys
         speed = self.player_stats["movement_speed"]
 
-        if (
-            self.active_effects["speed_boost"]["active"]
-            and time.time() < self.active_effects["speed_boost"]["end_time"]
-        ):
+        if self.now < self.speed_boost_end_time:
             speed *= 1.5
 
         dx, dy = 0, 0
@@ -2988,75 +4138,47 @@ class Game:
             dx *= 0.7071
             dy *= 0.7071
 
-        self.player_pos[0] += dx
-        self.player_pos[1] += dy
+        pos = self.player_pos
+        x = pos[0] = max(20, min(WIDTH - 20, pos[0] + dx))
+        y = pos[1] = max(20, min(HEIGHT - 20, pos[1] + dy))
 
-        self.player_pos[0] = max(20, min(WIDTH - 20, self.player_pos[0]))
-        self.player_pos[1] = max(20, min(HEIGHT - 20, self.player_pos[1]))
-
-        mouse_pos = pygame.mouse.get_pos()
-        target_angle = math.atan2(
-            mouse_pos[1] - self.player_pos[1],
-            mouse_pos[0] - self.player_pos[0],
-        )
+        mouse_pos = self.mouse_pos
+        target_angle = math.atan2(mouse_pos[1] - y, mouse_pos[0] - x)
 
-        angle_diff = (target_angle - self.player_angle + math.pi) % (
-            2 * math.pi
-        ) - math.pi
+        angle_diff = math.remainder(target_angle - self.player_angle, TWO_PI)
         self.player_angle += angle_diff * min(
             1.0, 0.2 * self.mouse_sensitivity * 2
         )
 
-        self.player_angle = (self.player_angle + 2 * math.pi) % (2 * math.pi)
-
     def update_active_effects(self):
-        current_time = time.time()
-
-        if (
-            self.active_effects["shield"]["active"]
-            and current_time >= self.active_effects["shield"]["end_time"]
-        ):
-            self.active_effects["shield"]["active"] = False
+        if self.shield_end_time and self.now >= self.shield_end_time:
+            self.shield_end_time = 0
             self.player_shield = 0
 
-        if (
-            self.active_effects["speed_boost"]["active"]
-            and current_time >= self.active_effects["speed_boost"]["end_time"]
-        ):
-            self.active_effects["speed_boost"]["active"] = False
-
-        if (
-            self.active_effects["damage_boost"]["active"]
-            and current_time >= self.active_effects["damage_boost"]["end_time"]
-        ):
-            self.active_effects["damage_boost"]["active"] = False
-
     def update_discord_rpc(self):
-        if self.rpc:
-            try:
-                mode = (
-                    "Multiplayer" if self.multiplayer_mode else "Singleplayer"
-                )
-                difficulty = self.difficulty.capitalize()
+        key = (
+            self.multiplayer_mode,
+            self.difficulty,
+            self.player_level,
+            self.score,
+            self.kills,
+        )
+        if key == self.rpc_key:
+            return
+        self.rpc_key = key
 
-                self.rpc.update(
-                    details=f"{mode} ({difficulty}) | Level: {self.player_level}",
-                    state=f"Score: {self.score} | Kills: {self.kills}",
-                    large_image="https://i.imgur.com/vn4pYBH.png",
-                    large_text="Bulletverse.io",
-                    small_image="https://th.bing.com/th/id/R.da61fa152c102c46c16786b9f79402f8?rik=l5kvYddcePaDtw&pid=ImgRaw&r=0",
-                    small_text="https://discord.gg/XVN6mYv5AJ",
-                    start=int(time.time()),
-                )
-            except:
-                pass
+        mode = "Multiplayer" if self.multiplayer_mode else "Singleplayer"
+        self.rpc_status = (
+            f"{mode} ({self.difficulty.capitalize()}) | Level: {self.player_level}",
+            f"Score: {self.score} | Kills: {self.kills}",
+        )
 
     def update_multiplayer(self):
         if not self.multiplayer_mode:
             return
 
         player_data = {
-            "pos": self.player_pos,
+            "pos": list(self.player_pos),
             "angle": self.player_angle,
             "health": self.player_health,
             "shield": self.player_shield,
@@ -3072,24 +4194,18 @@ class Game:
 
         self.new_bullets = []
 
-        if "powerups" in self.client.game_state:
-            for powerup in self.client.game_state["powerups"]:
-                if (
-                    math.hypot(
-                        powerup["pos"][0] - self.player_pos[0],
-                        powerup["pos"][1] - self.player_pos[1],
-                    )
-                    < 25
-                ):
-                    self.apply_powerup(powerup["type"])
+        powerups = self.client.game_state.get("powerups")
+        if powerups:
+            picked = points_within(
+                player_positions(powerups), self.player_pos, 25
+            )
+            for index in np.flatnonzero(picked).tolist():
+                self.apply_powerup(powerups[index]["type"])
 
     def apply_powerup(self, powerup_type):
         self.play_sound("powerup")
 
-        if self.particle_effects:
-            self.particles.add_particles(
-                self.player_pos, COLORS["PURPLE"], 15, 2.0, 40
-            )
+        self.spawn_particles(self.player_pos, COLORS["PURPLE"], 15, 2.0, 40)
 
         if powerup_type == "health":
             self.player_health = min(
@@ -3097,17 +4213,24 @@ class Game:
             )
         elif powerup_type == "shield":
             self.player_shield = 30
-            self.active_effects["shield"]["active"] = True
-            self.active_effects["shield"]["end_time"] = time.time() + 10
+            self.shield_end_time = self.activate_effect("shield", 10)
         elif powerup_type == "speed":
-            self.active_effects["speed_boost"]["active"] = True
-            self.active_effects["speed_boost"]["end_time"] = time.time() + 5
+            self.speed_boost_end_time = self.activate_effect("speed_boost", 5)
         elif powerup_type == "damage":
-            self.active_effects["damage_boost"]["active"] = True
-            self.active_effects["damage_boost"]["end_time"] = time.time() + 8
+            self.damage_boost_end_time = self.activate_effect(
+                "damage_boost", 8
+            )
         elif powerup_type == "xp":
             self.add_xp(30)
 
+    def activate_effect(self, name: str, duration: float) -> float:
+        end_time = self.now + duration
+        self.live_effects = [
+            live for live in self.live_effects if live[0] != name
+        ]
+        self.live_effects.append((name, end_time))
+        return end_time
+
     def add_xp(self, amount):
         self.player_xp += amount
 
@@ -3119,13 +4242,30 @@ class Game:
 
             self.play_sound("level_up")
 
-            if self.particle_effects:
-                self.particles.add_particles(
-                    self.player_pos, COLORS["YELLOW"], 20, 3.0, 60
-                )
+            self.spawn_particles(
+                self.player_pos, COLORS["YELLOW"], 20, 3.0, 60
+            )
+
+    def bind_particle_spawner(self):
+        self.spawn_particles = (
+            self.particles.add_particles
+            if self.particle_effects
+            else skip_particles
+        )
+
+    def acquire_powerup(self, pos, powerup_type):
+        if self.powerup_pool:
+            powerup = self.powerup_pool.pop()
+            powerup.reset(pos, powerup_type)
+            return powerup
+        return PowerUp(pos, powerup_type)
+
+    def release_powerup(self, powerup):
+        if len(self.powerup_pool) < POWERUP_POOL_SIZE:
+            self.powerup_pool.append(powerup)
 
     def update_singleplayer(self):
-        current_time = time.time()
+        current_time = self.now
 
         if current_time - self.last_powerup_time > random.uniform(15, 30):
             if len(self.powerups) < 5:
@@ -3134,28 +4274,35 @@ class Game:
                     random.randint(50, HEIGHT - 50),
                 )
 
-                types = ["health", "shield", "speed", "damage", "xp"]
-                weights = [0.25, 0.2, 0.2, 0.2, 0.15]
-                powerup_type = random.choices(types, weights=weights)[0]
+                powerup_type = random.choices(
+                    POWERUP_TYPES, cum_weights=POWERUP_CUM_WEIGHTS
+                )[0]
 
-                self.powerups.append(PowerUp(pos, powerup_type))
+                self.powerups.append(self.acquire_powerup(pos, powerup_type))
                 self.last_powerup_time = current_time
 
-        for powerup in list(self.powerups):
-            powerup.update()
-
-            if (
-                math.hypot(
-                    powerup.pos[0] - self.player_pos[0],
-                    powerup.pos[1] - self.player_pos[1],
-                )
-                < 25
-            ):
-                self.apply_powerup(powerup.type)
+        if self.powerups:
+            for powerup in self.powerups:
+                powerup.update()
 
-                self.powerups.remove(powerup)
+            picked = points_within(
+                np.array(
+                    [powerup.pos for powerup in self.powerups], np.float32
+                ),
+                self.player_pos,
+                25,
+            )
+            survivors = []
+            for powerup, hit in zip(self.powerups, picked.tolist()):
+                if hit:
+                    self.apply_powerup(powerup.type)
+                    self.release_powerup(powerup)
+                else:
+                    survivors.append(powerup)
+            self.powerups = survivors
 
         self.move_enemies()
+        self.rebuild_enemy_grid()
 
         self.move_bullets()
 
@@ -3164,175 +4311,92 @@ class Game:
             self.last_regen_time = current_time
 
     def move_enemies(self):
-        for enemy in self.enemies:
-            enemy["pos"][0] += enemy["speed"] * math.cos(enemy["angle"])
-            enemy["pos"][1] += enemy["speed"] * math.sin(enemy["angle"])
-
-            if enemy["pos"][0] <= 20 or enemy["pos"][0] >= WIDTH - 20:
-                enemy["angle"] = math.pi - enemy["angle"]
-            if enemy["pos"][1] <= 20 or enemy["pos"][1] >= HEIGHT - 20:
-                enemy["angle"] = -enemy["angle"]
-
-            if random.random() < 0.01:
-                enemy["angle"] += random.uniform(-0.5, 0.5)
-
-            if random.random() < 0.05:
-                target_angle = math.atan2(
-                    self.player_pos[1] - enemy["pos"][1],
-                    self.player_pos[0] - enemy["pos"][0],
-                )
-
-                angle_diff = (target_angle - enemy["angle"] + math.pi) % (
-                    2 * math.pi
-                ) - math.pi
-                enemy["angle"] += angle_diff * 0.1
-
-            enemy["fire_timer"] -= 1
-            if enemy["fire_timer"] <= 0:
-                enemy["fire_timer"] = ENEMY_FIRE_RATE * random.uniform(
-                    0.8, 1.2
-                )
-
-                dist = math.hypot(
-                    self.player_pos[0] - enemy["pos"][0],
-                    self.player_pos[1] - enemy["pos"][1],
-                )
-
-                if dist < 400:
-                    angle_to_player = math.atan2(
-                        self.player_pos[1] - enemy["pos"][1],
-                        self.player_pos[0] - enemy["pos"][0],
-                    )
-
-                    inaccuracy = min(0.2, dist / 2000)
-                    angle_to_player += random.uniform(-inaccuracy, inaccuracy)
+        enemies = self.enemies
+        shooting = enemies.update(
+            np.array((self.player_pos[:2],), np.float32),
+            self.enemy_bullets,
+            self.enemy_damage,
+        )
 
-                    self.enemy_bullets.append(
-                        [enemy["pos"][0], enemy["pos"][1], angle_to_player]
-                    )
+        if self.particle_effects:
+            spawn_particles = self.spawn_particles
+            red = COLORS["RED"]
+            for muzzle in enemies.pos[shooting].tolist():
+                spawn_particles(muzzle, red, 3, 1.0, 10)
 
-                    if self.particle_effects:
-                        bullet_pos = (enemy["pos"][0], enemy["pos"][1])
-                        self.particles.add_particles(
-                            bullet_pos, COLORS["RED"], 3, 1.0, 10
-                        )
+    def rebuild_enemy_grid(self):
+        self.enemy_grid = SpatialGrid(self.enemies.pos, self.enemies.size)
 
     def move_bullets(self):
-        for bullet in list(self.bullets):
-            bullet[0] += self.player_stats["bullet_speed"] * math.cos(
-                bullet[2]
+        bullets = self.bullets
+        alive = bullets.step(WIDTH, HEIGHT)
+
+        grid = self.enemy_grid
+        if len(grid) and alive.any():
+            n = len(bullets)
+            live = np.flatnonzero(alive)
+            rows, targets = grid.first_hits(bullets.pos[:n][live])
+            hits = live[rows]
+            enemies = self.enemies
+            landed, killed = resolve_hits(
+                enemies.health, targets, bullets.damage[hits]
             )
-            bullet[1] += self.player_stats["bullet_speed"] * math.sin(
-                bullet[2]
+            hits, targets, killed = (
+                hits[landed],
+                targets[landed],
+                killed[landed],
             )
 
-            if (
-                bullet[0] < 0
-                or bullet[0] > WIDTH
-                or bullet[1] < 0
-                or bullet[1] > HEIGHT
+            np.subtract.at(enemies.health, targets, bullets.damage[hits])
+            penetration = bullets.penetration
+            penetration[hits] -= 1
+            alive[hits] = penetration[hits] > 0
+
+            pos = bullets.pos[hits].tolist()
+            play_sound = self.play_sound
+            spawn_particles = self.spawn_particles
+            red = COLORS["RED"]
+            for hit_pos, index, kill in zip(
+                pos, targets.tolist(), killed.tolist()
             ):
-                self.bullets.remove(bullet)
-                continue
+                play_sound("hit")
 
-            for enemy in list(self.enemies):
-                if math.hypot(
-                    bullet[0] - enemy["pos"][0], bullet[1] - enemy["pos"][1]
-                ) < enemy.get("size", 20):
-                    damage = (
-                        bullet[4]
-                        if len(bullet) > 4
-                        else self.player_stats["bullet_damage"]
-                    )
-                    enemy["health"] -= damage
+                spawn_particles(hit_pos, red, 8, 1.5, 20)
 
-                    self.play_sound("hit")
+                if kill:
+                    self.score += 100
+                    self.kills += 1
 
-                    if self.particle_effects:
-                        hit_pos = (bullet[0], bullet[1])
-                        self.particles.add_particles(
-                            hit_pos, COLORS["RED"], 8, 1.5, 20
-                        )
+                    self.add_xp(10 * self.xp_multiplier)
 
-                    bullet[3] -= 1
-
-                    if bullet[3] <= 0:
-                        if bullet in self.bullets:
-                            self.bullets.remove(bullet)
-
-                    if enemy["health"] <= 0:
-                        self.score += 100
-                        self.kills += 1
-
-                        xp_gain = 10
-                        if (
-                            hasattr(self, "difficulty")
-                            and self.difficulty in DIFFICULTY_SETTINGS
-                        ):
-                            xp_gain *= DIFFICULTY_SETTINGS[self.difficulty][
-                                "xp_multiplier"
-                            ]
-                        self.add_xp(xp_gain)
-
-                        if random.random() < 0.1:
-                            powerup_type = random.choice(
-                                ["health", "shield", "speed", "damage", "xp"]
-                            )
-                            self.powerups.append(
-                                PowerUp(
-                                    (enemy["pos"][0], enemy["pos"][1]),
-                                    powerup_type,
-                                )
-                            )
+                    enemy_pos = tuple(enemies.pos[index].tolist())
+                    if random.random() < 0.1:
+                        powerup_type = random.choice(POWERUP_TYPES)
+                        self.powerups.append(
+                            self.acquire_powerup(enemy_pos, powerup_type)
+                        )
 
-                        if self.particle_effects:
-                            explosion_pos = (enemy["pos"][0], enemy["pos"][1])
-                            self.particles.add_particles(
-                                explosion_pos, COLORS["RED"], 20, 2.5, 40
-                            )
+                    spawn_particles(enemy_pos, red, 20, 2.5, 40)
 
-                        self.enemies.remove(enemy)
-                        self.enemies.append(
-                            spawn_enemy(
-                                self.difficulty
-                                if hasattr(self, "difficulty")
-                                else "normal"
-                            )
-                        )
+                    enemies.respawn(index, self.difficulty)
 
-                    break
+        bullets.keep(alive)
 
-        for bullet in list(self.enemy_bullets):
-            bullet[0] += ENEMY_BULLET_SPEED * math.cos(bullet[2])
-            bullet[1] += ENEMY_BULLET_SPEED * math.sin(bullet[2])
+        enemy_bullets = self.enemy_bullets
+        alive = enemy_bullets.step(WIDTH, HEIGHT)
 
-            if (
-                bullet[0] < 0
-                or bullet[0] > WIDTH
-                or bullet[1] < 0
-                or bullet[1] > HEIGHT
-            ):
-                self.enemy_bullets.remove(bullet)
-                continue
+        if not self.is_dead and alive.any():
+            hit = alive & points_within(
+                enemy_bullets.pos[: len(enemy_bullets)], self.player_pos, 20
+            )
 
-            if (
-                not self.is_dead
-                and math.hypot(
-                    bullet[0] - self.player_pos[0],
-                    bullet[1] - self.player_pos[1],
-                )
-                < 20
-            ):
-                damage = 10
-                if (
-                    hasattr(self, "difficulty")
-                    and self.difficulty in DIFFICULTY_SETTINGS
-                ):
-                    damage = DIFFICULTY_SETTINGS[self.difficulty][
-                        "enemy_damage"
-                    ]
+            damage = self.enemy_damage
+            px, py = self.player_pos[:2]
+            for i in np.flatnonzero(hit).tolist():
+                if self.is_dead:
+                    break
 
-                if hasattr(self, "player_shield") and self.player_shield > 0:
+                if self.player_shield > 0:
                     self.player_shield -= damage
                     if self.player_shield < 0:
                         self.player_health += self.player_shield
@@ -3344,17 +4408,16 @@ class Game:
 
                 if self.particle_effects:
                     hit_pos = (
-                        self.player_pos[0] + random.uniform(-10, 10),
-                        self.player_pos[1] + random.uniform(-10, 10),
+                        px + random.uniform(-10, 10),
+                        py + random.uniform(-10, 10),
                     )
-                    self.particles.add_particles(
-                        hit_pos, COLORS["RED"], 8, 1.5, 20
-                    )
-
-                self.enemy_bullets.remove(bullet)
+                    self.spawn_particles(hit_pos, COLORS["RED"], 8, 1.5, 20)
 
                 if self.player_health <= 0:
                     self.player_died()
+                alive[i] = False
+
+        enemy_bullets.keep(alive)
 
     def health_regeneration(self):
         if (
@@ -3370,42 +4433,33 @@ class Game:
     def player_died(self):
         self.is_dead = True
 
-        self.respawn_time = time.time() + 5
+        self.respawn_time = self.now + 5
 
         self.play_sound("death")
 
-        if self.particle_effects:
-            self.particles.add_particles(
-                self.player_pos, COLORS["BLUE"], 30, 3.0, 60
-            )
+        self.spawn_particles(self.player_pos, COLORS["BLUE"], 30, 3.0, 60)
 
     def check_respawn(self):
-        if self.is_dead and time.time() >= self.respawn_time:
+        if self.is_dead and self.now >= self.respawn_time:
             self.is_dead = False
             self.player_health = self.player_stats["max_health"]
             self.player_shield = 0
 
-            safe_respawn = False
-            tries = 0
-            while not safe_respawn and tries < 10:
-                self.player_pos = [
-                    random.randint(100, WIDTH - 100),
-                    random.randint(100, HEIGHT - 100),
-                ]
+            candidates = np.column_stack(
+                (
+                    np.random.randint(100, WIDTH - 99, RESPAWN_TRIES),
+                    np.random.randint(100, HEIGHT - 99, RESPAWN_TRIES),
+                )
+            ).astype(np.float32)
 
-                safe_respawn = True
-                for enemy in self.enemies:
-                    if (
-                        math.hypot(
-                            self.player_pos[0] - enemy["pos"][0],
-                            self.player_pos[1] - enemy["pos"][1],
-                        )
-                        < 200
-                    ):
-                        safe_respawn = False
-                        break
+            choice = 0
+            if len(self.enemies):
+                diff = candidates[:, None, :] - self.enemies.pos[None, :, :]
+                min_dist_sq = (diff * diff).sum(axis=2).min(axis=1)
+                safe = np.flatnonzero(min_dist_sq >= 200 * 200)
+                choice = safe[0] if safe.size else RESPAWN_TRIES - 1
 
-                tries += 1
+            self.player_pos = candidates[choice].tolist()
 
     def update_settings_menu(self):
         self.update_settings()
@@ -3414,14 +4468,17 @@ class Game:
         if self.show_upgrade_menu:
             return
 
+        if self.is_dead:
+            self.particles.update()
+            self.check_respawn()
+            return
+
         self.update_player_position()
 
         self.update_active_effects()
 
         self.particles.update()
 
-        self.check_respawn()
-
         if self.multiplayer_mode:
             self.update_multiplayer()
         else:
@@ -3430,130 +4487,207 @@ class Game:
         if self.reload_timer > 0:
             self.reload_timer -= 1
 
-        if time.time() % 15 < 0.1:
+        if self.rpc:
             self.update_discord_rpc()
 
-    def run(self):
-        while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    break
-
-                if self.current_screen == "loading":
-                    continue
-
-                if (
-                    self.current_screen == "main_menu"
-                    or self.current_screen == "host"
-                    or self.current_screen == "join"
-                ):
-                    self.handle_menu_events(event)
-                else:
-                    self.handle_game_events(event)
+    def menu_changed(self) -> bool:
+        state = (
+            self.current_screen,
+            self.show_settings_menu,
+            self.mouse_pos,
+            self.mouse_buttons,
+            self.difficulty,
+            self.fullscreen,
+            self.particle_effects,
+            self.fps_display,
+            self.cheap_dim,
+            self.player_color_name,
+        )
+        if state == self.menu_state:
+            return False
+        self.menu_state = state
+        return True
+
+    def frame_steps(self, dt: float) -> int:
+        debt = self.frame_debt + dt * FPS
+        steps = min(round(debt), MAX_FRAME_STEPS)
+        self.frame_debt = debt - steps if steps < MAX_FRAME_STEPS else 0.0
+        return steps
+
+    def draw_game(self):
+        screen = self.screen
+        white = COLORS["WHITE"]
+        previous = self.dirty_rects
+        overlay = (
+            self.is_dead or self.show_upgrade_menu or self.show_cosmetics_menu
+        )
+        full_redraw = previous is None or overlay
+        if full_redraw:
+            screen.fill(white)
+        else:
+            for rect in previous:
+                screen.fill(white, rect)
+
+        self.dirty_rects = []
+        self.draw_players()
+        self.draw_powerups()
+        self.draw_bullets()
+        self.draw_enemies()
+        self.draw_particles()
+        self.draw_ui()
+        self.draw_upgrade_menu()
 
-            if self.current_screen == "loading":
-                self.loading_screen.update(dt)
-                self.loading_screen.draw()
+        if self.is_dead:
+            self.draw_death_screen()
+        self.draw_cosmetics_menu()
 
-                if self.loading_screen.loading_complete:
-                    if not hasattr(self, "completion_delay"):
-                        self.completion_delay = time.time() + 0.7
+        if full_redraw:
+            pygame.display.flip()
+            if overlay:
+                self.dirty_rects = None
+        else:
+            pygame.display.update(previous + self.dirty_rects)
 
-                    if time.time() >= self.completion_delay:
-                        self.current_screen = "main_menu"
-                        self.load_and_play_background_music()
-                        delattr(self, "completion_delay")
+    def loading_frame(self, dt: float):
+        self.loading_screen.update(dt)
+        self.loading_screen.draw()
 
-            elif self.current_screen == "game":
-                self.update_game()
+        if self.loading_screen.loading_complete:
+            if not hasattr(self, "completion_delay"):
+                self.completion_delay = self.now + 0.7
 
-                self.screen.fill(COLORS["WHITE"])
-                self.draw_players()
-                self.draw_powerups()
-                self.draw_bullets()
-                self.draw_enemies()
-                self.draw_particles()
-                self.draw_ui()
+            if self.now >= self.completion_delay:
+                self.current_screen = "main_menu"
+                self.load_and_play_background_music()
+                delattr(self, "completion_delay")
 
-                if self.show_upgrade_menu:
-                    self.draw_upgrade_menu()
+    def game_frame(self, dt: float):
+        self.advance_game(dt)
+        self.draw_game()
 
-                if self.is_dead:
-                    self.draw_death_screen()
-                if self.show_cosmetics_menu:
-                    self.draw_cosmetics_menu()
+    def main_menu_frame(self, dt: float):
+        self.draw_main_menu()
+        self.draw_settings_menu()
+        pygame.display.flip()
+        self.menu_state = None
 
-                pygame.display.flip()
+    def host_frame(self, dt: float):
+        if self.menu_changed():
+            self.draw_host_menu()
+            pygame.display.flip()
 
-            elif self.current_screen == "main_menu":
-                self.draw_main_menu()
+    def join_frame(self, dt: float):
+        if self.menu_changed():
+            self.draw_join_menu()
+            pygame.display.flip()
 
-                if self.show_settings_menu:
-                    self.draw_settings_menu()
+    def settings_frame(self, dt: float):
+        if not self.show_settings_menu:
+            return
+        self.update_settings_menu()
+        if self.menu_changed():
+            self.draw_settings_menu()
+            pygame.display.flip()
+
+    def background_frame(self, dt: float):
+        self.menu_state = None
+        if self.current_screen == "loading":
+            self.loading_frame(dt)
+        elif self.current_screen == "game":
+            self.advance_game(dt)
+            self.dirty_rects = None
+
+    def advance_game(self, dt: float):
+        for _ in range(self.frame_steps(dt)):
+            self.update_game()
 
-                pygame.display.flip()
+    def run(self):
+        while self.running:
+            visible = pygame.display.get_active()
+            dt = self.clock.tick(FPS if visible else BACKGROUND_FPS) / 1000.0
+            self.now = time.monotonic()
 
-            elif self.current_screen == "host":
-                self.draw_host_menu()
-                pygame.display.flip()
+            if self.current_screen == "loading":
+                if pygame.event.peek(pygame.QUIT):
+                    self.running = False
+                pygame.event.clear()
+            else:
+                events = pygame.event.get()
+                self.mouse_pos = pygame.mouse.get_pos()
+                self.mouse_buttons = pygame.mouse.get_pressed()
+                self.keys = pygame.key.get_pressed()
+
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                        break
 
-            elif self.current_screen == "join":
-                self.draw_join_menu()
-                pygame.display.flip()
+                    handler = self.event_handlers.get(
+                        self.current_screen, self.handle_game_events
+                    )
+                    handler(event)
 
-            elif self.show_settings_menu:
-                self.update_settings_menu()
-                self.draw_settings_menu()
-                pygame.display.flip()
+            if visible:
+                frame = self.frame_handlers.get(
+                    self.current_screen, self.settings_frame
+                )
+                frame(dt)
+            else:
+                self.background_frame(dt)
 
         self.save_settings()
+        self.settings_queue.put(None)
 
         if self.rpc:
-            self.rpc.close()
+            self.rpc_wake.set()
 
-        if self.client:
-            self.client.close()
+        closers = [
+            threading.Thread(target=conn.close, daemon=True)
+            for conn in (self.rpc, self.client, self.server)
+            if conn
+        ]
+        for closer in closers:
+            closer.start()
 
-        if self.server:
-            self.server.close()
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for closer in closers:
+            closer.join(max(0.0, deadline - time.monotonic()))
 
+        self.settings_thread.join(SHUTDOWN_TIMEOUT)
         pygame.quit()
 
-    def run_dedicated_server():
-        server = GameServer(SERVER_HOST, SERVER_PORT)
-        if server.start():
-            logger.info("Dedicated server started. Press Ctrl+C to stop.")
-            try:
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                logger.info("Server shutdown requested.")
-            finally:
-                server.close()
-        else:
-            logger.error("Failed to start dedicated server.")
 
+def run_dedicated_server():
+    global WIDTH, HEIGHT
+    WIDTH, HEIGHT = 1280, 720
+    stop = threading.Event()
 
-if __name__ == "__main__":
-    import sys
-    import os
+    def request_stop(signum, frame):
+        logger.info("Server shutdown requested.")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
 
+    server = GameServer(SERVER_HOST, SERVER_PORT)
+    if server.start():
+        logger.info("Dedicated server started. Press Ctrl+C to stop.")
+        try:
+            stop.wait()
+        finally:
+            server.close()
+    else:
+        logger.error("Failed to start dedicated server.")
+
+
+if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--server":
         run_dedicated_server()
     else:
+        atexit.register(pygame.quit)
         try:
-            if not os.path.exists("assets"):
-                os.makedirs("assets")
-                logger.info("Created assets directory")
-            if not os.path.exists("assets/sounds"):
-                os.makedirs("assets/sounds")
-                logger.info("Created sounds directory")
-
+            os.makedirs("assets/sounds", exist_ok=True)
             game = Game()
             game.run()
-        except Exception as e:
+        except (pygame.error, OSError, RuntimeError) as e:
             logger.critical(f"Unhandled error: {e}", exc_info=True)
-            pygame.quit()